@@ -1,23 +1,18 @@
+import os
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
-import plotly.express as px
-from sklearn.metrics import confusion_matrix
-from sklearn.model_selection import train_test_split
-
-from components.model_train import (
-    train_best_xgb_model,
-    train_xgb_model_with_smote,
-    plot_metrics_bar
-)
-from utils.data_processor import load_fitbit_data
-from components.care_analytic import show_healthcare_result
-from components.care_graph import show_healthcare_graph
-from components.care_predict import show_prediction_summary, prepare_data, get_cross_val_probs
-from components.care_predict_graph import show_prediction_graphs
-from components.model_compare import compare_models, split_data
-from components.care_userData import show_user_data
+
+# 무거운 라이브러리(matplotlib, seaborn, plotly, sklearn, xgboost, st_aggrid)는
+# 해당 페이지를 그릴 때만 import 되도록 페이지별 모듈은 아래 분기 안에서 import
+from utils.data_processor import APP_COLUMNS, load_fitbit_data
+from utils.segments import AGE_LABELS, segment_query
+from components.figure_cache import figure_cache_stats
+from components.pipeline import run_user_pipeline, run_segment_pipeline, pipeline_log
+from utils import profiling
+from utils.profiling import span
+
+# ✅ 설정 시 매 실행마다 구간 누적값을 Prometheus 텍스트 파일로 기록 (예: node_exporter textfile 경로)
+METRICS_FILE = os.environ.get("CHURN_METRICS_FILE")
 
 # ├── Sidebar state
 if 'show_healthcare_sub' not in st.session_state:
@@ -54,37 +49,49 @@ with st.sidebar:
         st.session_state['show_healthcare_sub'] = False
         st.session_state['show_prediction_sub'] = False
 
+    # 그래프 캐시 통계는 페이지를 그린 뒤에 채움 (이번 실행의 적중/미적중까지 반영)
+    figure_cache_panel = st.expander("🖼️ 그래프 캐시")
+
     # if st.button("모델 비교"):
     #     st.session_state['main_menu'] = "모델 비교"
 
+    perf_panel = st.expander("📈 성능 측정")
+    with perf_panel:
+        profile_on = st.checkbox("구간별 시간 측정", value=os.environ.get("CHURN_PROFILE") == "1",
+                                 key="profiling_enabled")
+        profile_memory = st.checkbox("메모리 포함 (tracemalloc, 느려짐)", value=False,
+                                     key="profiling_memory", disabled=not profile_on)
+
+# ├── Instrumentation (꺼져 있으면 span()은 아무것도 하지 않음)
+profiling.start_run(enabled=profile_on or bool(METRICS_FILE), memory=profile_on and profile_memory)
+
 # ├── Data loading
 with st.spinner("📂 Fitbit 데이터 로드 중..."):
-    df = load_fitbit_data()
+    # 페이지에서 쓰는 컬럼만 + 작은 dtype(category/int8/float32 등)으로 로드
+    with span("load_fitbit_data"):
+        df = load_fitbit_data(columns=APP_COLUMNS, compact=True)
     st.sidebar.success("✅ 데이터 로드 완료!")
 
+with st.sidebar.expander("🧮 메모리 사용량"):
+    memory = pd.DataFrame(df.attrs.get("memory_report", []))
+    if not memory.empty:
+        total = memory.iloc[-1]
+        st.caption(f"{total['mb_before']:.1f}MB → {total['mb_after']:.1f}MB ({total['ratio'] * 100:.0f}%)")
+        st.dataframe(memory, hide_index=True)
+
 # ├── Overview function
 
 def show_overview():
+    import plotly.express as px
+
     st.header("🔢 연령별 사용자 수치")
     try:
-        df_user, X, y = prepare_data(df)
+        # 🔍 사용자 테이블 + 원본 df의 성별/나이 정보로 만든 세그먼트 큐브 (세션 내 메모이즈)
+        _, cube = run_segment_pipeline(df, until="demographics")
 
-        # 🔍 원본 df에서 age 정보 병합
-        df_user = df_user.copy()
-        df_user = pd.merge(df_user, df[["id", "age"]].drop_duplicates(), on="id", how="left")
-
-        # age 변환 및 필터링
-        df_user["age"] = pd.to_numeric(df_user["age"], errors="coerce")
-        df_user = df_user.dropna(subset=["age"])
-        df_user = df_user[df_user["age"] >= 10]
-
-        # 연령대 구간
-        bins = [0, 29, 39, 49, 59, 69, 150]
-        labels = ['20대', '30대', '40대', '50대', '60대', '70대 이상']
-        df_user["age_group"] = pd.cut(df_user["age"], bins=bins, labels=labels)
-
-        # 분포 계산
-        age_dist = df_user["age_group"].value_counts().sort_index()
+        # 연령대별 인원 (10세 미만/나이 없음 제외, 큐브 조회)
+        age_dist = segment_query(cube, by=["age_group"])["n"]
+        age_dist = age_dist.reindex(AGE_LABELS, fill_value=0)
         total = age_dist.sum()
         age_percent = (age_dist / total) * 100 if total > 0 else pd.Series(data=[0]*len(age_dist), index=age_dist.index)
 
@@ -103,7 +110,7 @@ def show_overview():
             st.plotly_chart(fig, use_container_width=True)
 
         with col2:
-            st.write("사용자 수: ", len(df_user))
+            st.write("사용자 수: ", int(total))
             age_df = age_percent.round(2).reset_index()
             age_df.columns = ["연령대", "비율 (%)"]
             st.dataframe(age_df)
@@ -120,54 +127,63 @@ def show_overview():
 # ├── Render content
 menu = st.session_state.get("main_menu", "지표 확인")
 
-if menu == "지표 확인":
-    show_overview()
-
-elif menu == "헬스케어 분석":
-    df_user, X, y = prepare_data(df)
-
-    # 🔹 성별 및 나이 추가 병합
-    demographics = df[["id", "gender", "age"]].drop_duplicates()
-    df_user = pd.merge(df_user, demographics, on="id", how="left")
-
-    # 🔹 이탈 확률 및 위험군 추가
-    probs = get_cross_val_probs(X, y)
-    df_user["churn_prob"] = probs
-    df_user["risk"] = pd.cut(df_user["churn_prob"], bins=[-0.01, 0.3, 0.7, 1.01], labels=["저위험", "중위험", "고위험"])
-
-    show_healthcare_result(df_user)
-
-elif menu == "예측 결과 - 결과":
-    show_prediction_summary(df)
-
-elif menu == "예측 결과 - 이용자 관리":
-
-    df_user, X, y = prepare_data(df)
-    probs = get_cross_val_probs(X, y)
-    df_user["churn_prob"] = probs
-    df_user["risk"] = pd.cut(df_user["churn_prob"], bins=[-0.01, 0.3, 0.7, 1.01], labels=["저위험", "중위험", "고위험"])
-    
-    # 🔹 성별 및 나이 추가 병합 (필요 시)
-    demographics = df[["id", "gender", "age"]].drop_duplicates()
-    df_user = pd.merge(df_user, demographics, on="id", how="left")
-
-    show_prediction_graphs(df_user)
-
-
-elif menu == "이용자 데이터":
-
-    # 1. 예측 대상 데이터 준비
-    df_user, X, y = prepare_data(df)
-
-    # 2. 이탈 확률 및 등급 부여
-    df_user["churn_prob"] = get_cross_val_probs(X, y)
-    df_user["risk"] = pd.cut(df_user["churn_prob"], bins=[-0.01, 0.3, 0.7, 1.01], labels=["저위험", "중위험", "고위험"])
-
-    # 3. 성별, 나이 정보 병합
-    demographics = df[["id", "gender", "age"]].drop_duplicates()
-    df_user = pd.merge(df_user, demographics, on="id", how="left")
-
-    # 4. 사용자 UI 출력 
-    show_user_data(df_user)
-
-
+with span(f"page:{menu}"):
+    if menu == "지표 확인":
+        show_overview()
+
+    elif menu == "헬스케어 분석":
+        from components.care_analytic import show_healthcare_result
+
+        # 🔹 사용자 집계 → 이탈 확률/위험군 → 성별/나이 병합
+        df_user, cube = run_segment_pipeline(df)
+        show_healthcare_result(df_user, cube=cube)
+
+    elif menu == "예측 결과 - 결과":
+        from components.care_predict import show_prediction_summary
+
+        # 🔹 위험군 인원은 성별/나이 병합 전(사용자당 1행) 단계에서 집계
+        df_user, cube = run_segment_pipeline(df, until="risk")
+        show_prediction_summary(df, df_user=df_user, cube=cube)
+
+    elif menu == "예측 결과 - 이용자 관리":
+        from components.care_predict_graph import show_prediction_graphs
+
+        show_prediction_graphs(run_user_pipeline(df))
+
+
+    elif menu == "이용자 데이터":
+        from components.care_userData import show_user_data
+
+        show_user_data(run_user_pipeline(df))
+
+# ├── Figure cache report
+with figure_cache_panel:
+    stats = figure_cache_stats()
+    st.caption(f"적중 {stats['hits']} · 미적중 {stats['misses']} · 제거 {stats['evictions']} "
+               f"· {stats['entries']}개 / {stats['megabytes']}MB")
+
+# ├── Pipeline stage report
+with st.sidebar.expander("⏱️ 파이프라인 단계"):
+    for entry in pipeline_log():
+        icon = "✅" if entry["status"] == "hit" else "🔄"
+        st.caption(f"{icon} {entry['stage']} · {entry['status']} · {entry['seconds']:.3f}s")
+
+# ├── Performance panel
+spans = profiling.end_run()
+if METRICS_FILE:
+    profiling.write_prometheus(METRICS_FILE)
+if profile_on:
+    with perf_panel:
+        st.caption("이번 실행의 구간 (들여쓰기 = 중첩)")
+        st.dataframe(pd.DataFrame([
+            {**r, "name": "　" * r["depth"] + r["name"]} for r in spans
+        ]).drop(columns=["depth"]), hide_index=True)
+        st.caption("구간별 합계")
+        st.dataframe(pd.DataFrame(profiling.summarize(spans)).round(4), hide_index=True)
+        c1, c2 = st.columns(2)
+        with c1:
+            st.download_button("JSON", profiling.to_json(spans), file_name="spans.json",
+                               mime="application/json", use_container_width=True)
+        with c2:
+            st.download_button("Prometheus", profiling.to_prometheus(), file_name="churn_dashboard.prom",
+                               mime="text/plain", use_container_width=True)
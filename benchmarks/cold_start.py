@@ -0,0 +1,141 @@
+"""
+콜드 스타트 벤치마크
+- 모듈별 import 시간 (모듈마다 새 프로세스에서 측정)
+- 페이지별 첫 렌더링까지 걸리는 시간 (페이지마다 새 프로세스 + streamlit AppTest)
+- --baseline 으로 이전 결과 JSON을 주면 허용 비율 이상 느려진 항목을 회귀로 표시
+
+사용 예:
+    python -m benchmarks.cold_start --output bench_cold_start.json
+    python -m benchmarks.cold_start --workdir /path/with/data --baseline old.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ✅ app.py가 시작할 때 / 페이지별로 import 하는 모듈
+IMPORT_TARGETS = [
+    "app_startup:utils.data_processor,components.care_predict,components.figure_cache",
+    "components.care_analytic",
+    "components.care_predict_graph",
+    "components.care_userData",
+    "plotly.express",
+    "matplotlib.pyplot",
+    "seaborn",
+    "sklearn.model_selection",
+    "xgboost",
+    "st_aggrid",
+]
+
+# ✅ app.py 메뉴 이름
+PAGES = ["지표 확인", "헬스케어 분석", "예측 결과 - 결과", "예측 결과 - 이용자 관리", "이용자 데이터"]
+
+_IMPORT_SNIPPET = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+print(json.dumps({{"seconds": time.perf_counter() - start}}))
+"""
+
+_RENDER_SNIPPET = """
+import sys, time, json, warnings
+warnings.filterwarnings("ignore")
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout={timeout})
+at.session_state["main_menu"] = {page!r}
+at.run()
+elapsed = time.perf_counter() - start
+errors = [e.value for e in at.exception] + [e.value for e in at.error]
+print(json.dumps({{"seconds": elapsed, "errors": [str(e) for e in errors]}}, ensure_ascii=False))
+"""
+
+
+def _run_snippet(code, cwd):
+    proc = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True)
+    lines = [l for l in proc.stdout.strip().splitlines() if l.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        return {"seconds": None, "errors": [proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"]}
+    return json.loads(lines[-1])
+
+
+def measure_imports(repeat=3):
+    results = {}
+    for target in IMPORT_TARGETS:
+        label, _, modules = target.partition(":")
+        modules = (modules or label).split(",")
+        runs = [_run_snippet(_IMPORT_SNIPPET.format(root=REPO_ROOT, modules=modules), REPO_ROOT)
+                for _ in range(repeat)]
+        times = [r["seconds"] for r in runs if r.get("seconds") is not None]
+        results[label] = {"seconds": min(times) if times else None, "errors": runs[-1].get("errors", [])}
+    return results
+
+
+def measure_pages(workdir, timeout=300):
+    results = {}
+    app_path = os.path.join(REPO_ROOT, "app.py")
+    for page in PAGES:
+        code = _RENDER_SNIPPET.format(root=REPO_ROOT, app=app_path, page=page, timeout=timeout)
+        results[page] = _run_snippet(code, workdir)
+    return results
+
+
+def compare(current, baseline, tolerance):
+    # 허용 비율(tolerance)보다 더 느려진 항목 목록
+    regressions = []
+    for section in ("imports", "pages"):
+        for name, now in current.get(section, {}).items():
+            before = baseline.get(section, {}).get(name, {})
+            if now.get("seconds") is None or not before.get("seconds"):
+                continue
+            ratio = now["seconds"] / before["seconds"]
+            if ratio > 1 + tolerance:
+                regressions.append({"section": section, "name": name, "before": before["seconds"],
+                                    "now": now["seconds"], "ratio": round(ratio, 2)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="app.py 콜드 스타트 벤치마크")
+    parser.add_argument("--workdir", default=REPO_ROOT, help="data/raw/... 경로가 있는 실행 디렉터리")
+    parser.add_argument("--output", default="bench_cold_start.json")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-pages", action="store_true")
+    args = parser.parse_args()
+
+    result = {
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "imports": measure_imports(args.repeat),
+        "pages": {} if args.skip_pages else measure_pages(os.path.abspath(args.workdir)),
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            result["regressions"] = compare(result, json.load(f), args.tolerance)
+        exit_code = 1 if result["regressions"] else 0
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    for section in ("imports", "pages"):
+        for name, r in result[section].items():
+            seconds = "실패" if r["seconds"] is None else f"{r['seconds']:.3f}s"
+            print(f"[{section}] {name:<40} {seconds} {' '.join(r.get('errors', []))}")
+    for r in result.get("regressions", []):
+        print(f"⚠️ 회귀: [{r['section']}] {r['name']} {r['before']:.3f}s → {r['now']:.3f}s (x{r['ratio']})")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+LifeSnaps daily_fitbit_sema_df_unprocessed.csv 형태의 합성 데이터 생성기
+- 사용자마다 연속된 날짜 구간(중간 결측일 포함), 24자리 hex id
+- convert_age_to_int가 처리하는 여러 나이 문자열 형식 + 일부 결측/잘못된 값
+- base_cols(steps, calories, ...)는 사용자별 활동 수준 × 일별 변동으로 생성 (이탈자 비율 약 30%)
+- 사용자 블록 단위로 CSV에 이어 쓰므로 수천만 행도 메모리에 한 번에 올리지 않음
+
+사용 예:
+    python -m benchmarks.generate_data --rows 1000000 --output data/synthetic/1m
+    python -m benchmarks.generate_data --rows 10000 --output /tmp/bench/data/raw/lifesnaps/rais_anonymized/csv_rais_anonymized
+"""
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from utils.data_processor import DAILY_FILE
+
+# ✅ 나이 문자열 형식과 비율 (마지막 두 개는 로더에서 제거되는 값)
+AGE_FORMATS = np.array(["<30", ">=30", "30s", "40대", "30-39", "25", "35~44", None, "unknown"], dtype=object)
+AGE_WEIGHTS = np.array([0.35, 0.3, 0.08, 0.07, 0.06, 0.05, 0.04, 0.03, 0.02])
+
+BMI_VALUES = np.array(["<19", "19", "20", "21", "22", "23", "24", "25", ">=25", ">=30", None], dtype=object)
+BADGE_TYPES = np.array(["DAILY_STEPS", "LIFETIME_DISTANCE", "DAILY_FLOORS"], dtype=object)
+START_DATE = np.datetime64("2021-05-24")
+DAYS_MIN, DAYS_MAX = 30, 150
+USERS_PER_BLOCK = 2_000
+
+
+def _user_ids(rng, n):
+    parts = rng.integers(0, 2 ** 32, size=(n, 3), dtype=np.uint64)
+    return np.array([f"{a:08x}{b:08x}{c:08x}" for a, b, c in parts], dtype=object)
+
+
+def generate_block(rng, n_users, mean_days):
+    """
+    사용자 n_users명 분량의 일별 DataFrame (사용자별 행이 날짜순으로 이어짐)
+    """
+    ids = _user_ids(rng, n_users)
+    days = np.clip(rng.poisson(mean_days, n_users), DAYS_MIN, DAYS_MAX)
+    offsets = rng.integers(0, 60, n_users)
+    activity = rng.lognormal(mean=0.0, sigma=0.45, size=n_users)
+    age = rng.choice(AGE_FORMATS, size=n_users, p=AGE_WEIGHTS / AGE_WEIGHTS.sum())
+    gender = rng.choice(np.array(["MALE", "FEMALE"], dtype=object), size=n_users, p=[0.55, 0.45])
+    bmi = rng.choice(BMI_VALUES, size=n_users)
+
+    # 사용자 → 행 펼치기 (사용자 내 일차 = 전체 순번 - 사용자 시작 위치)
+    user = np.repeat(np.arange(n_users), days)
+    starts = np.repeat(np.cumsum(days) - days, days)
+    day = np.arange(len(user)) - starts
+    keep = rng.random(len(user)) > 0.06          # 중간중간 기록 없는 날
+    user, day = user[keep], day[keep]
+    n = len(user)
+
+    scale = activity[user] * rng.lognormal(0.0, 0.35, n)
+    steps = rng.gamma(3.0, 2700.0, n) * scale
+    df = pd.DataFrame({
+        "id": ids[user],
+        "date": (START_DATE + offsets[user] + day).astype("datetime64[D]").astype(str),
+        "steps": np.round(steps),
+        "calories": np.round(1350 + steps * 0.06 + rng.normal(0, 120, n)),
+        "very_active_minutes": np.round(rng.gamma(1.2, 6.5, n) * scale),
+        "moderately_active_minutes": np.round(rng.gamma(1.5, 6.5, n) * scale),
+        "distance": np.round(steps * rng.normal(0.72, 0.05, n), 1),
+        "sleep_duration": np.round(rng.normal(7.0, 1.1, n) * 3_600_000),
+        "stress_score": np.round(rng.normal(75, 8, n)),
+        "mindfulness_session": rng.random(n) < 0.03,
+        "badgeType": np.where(rng.random(n) < 0.05, rng.choice(BADGE_TYPES, n), None),
+        "age": age[user],
+        "gender": gender[user],
+        "bmi": bmi[user],
+        "ALERT": np.where(rng.random(n) < 0.15, (rng.random(n) < 0.3).astype(float), np.nan),
+        "HAPPY": np.where(rng.random(n) < 0.15, (rng.random(n) < 0.4).astype(float), np.nan),
+        "SAD": np.where(rng.random(n) < 0.15, (rng.random(n) < 0.1).astype(float), np.nan),
+    })
+
+    # 측정 누락 (원본처럼 일부 지표만 비어 있는 행)
+    for col, rate in (("steps", 0.03), ("calories", 0.02), ("distance", 0.03),
+                      ("sleep_duration", 0.2), ("stress_score", 0.3)):
+        df.loc[rng.random(n) < rate, col] = np.nan
+    return df
+
+
+def write_dataset(output_dir, rows, seed=42, mean_days=90, block_users=USERS_PER_BLOCK, verbose=False):
+    """
+    약 rows행 분량의 CSV를 output_dir/DAILY_FILE로 생성
+    반환: {"path", "rows", "users", "seconds"}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, DAILY_FILE)
+    tmp_path = path + ".tmp"
+    rng = np.random.default_rng(seed)
+    # 평균 보존 행 비율(결측일 제외)을 감안한 사용자 수
+    n_users = max(1, int(round(rows / (mean_days * 0.94))))
+
+    start = time.perf_counter()
+    written = 0
+    done_users = 0
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        while done_users < n_users:
+            size = min(block_users, n_users - done_users)
+            block = generate_block(rng, size, mean_days)
+            block.to_csv(f, index=False, header=(done_users == 0))
+            written += len(block)
+            done_users += size
+            if verbose:
+                print(f"  {done_users:,}/{n_users:,}명 · {written:,}행")
+    os.replace(tmp_path, path)
+    return {"path": path, "rows": written, "users": n_users, "seconds": round(time.perf_counter() - start, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LifeSnaps 형태 합성 일별 데이터 생성")
+    parser.add_argument("--rows", type=int, default=10_000, help="대략적인 전체 행 수")
+    parser.add_argument("--output", required=True, help="CSV를 저장할 디렉터리")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mean-days", type=int, default=90, help="사용자당 평균 기록 일수")
+    args = parser.parse_args()
+
+    info = write_dataset(args.output, args.rows, seed=args.seed, mean_days=args.mean_days, verbose=True)
+    print(f"✅ {info['path']} · {info['rows']:,}행 · {info['users']:,}명 · {info['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
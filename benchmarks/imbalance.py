@@ -0,0 +1,116 @@
+"""
+model_train.prepare_data 불균형 처리 방식별 벤치마크 (smote / weight / blocked_smote)
+- 사용자 20%를 공통 평가용(holdout, 실제 이탈 비율 그대로)으로 먼저 떼어 둠
+- 나머지로 방식마다 새 프로세스에서 prepare_data → 파라미터 탐색/학습 → threshold 선택(prepare_data의 test 분할)
+- holdout에서 선택된 threshold의 precision/recall 측정 + 단계별 시간, 최대 메모리(RSS), 학습 행 수 기록
+
+사용 예:
+    python -m benchmarks.imbalance --rows 1000000 --output bench_imbalance.json
+    python -m benchmarks.imbalance --data data/raw/lifesnaps/rais_anonymized/csv_rais_anonymized
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+from benchmarks.cold_start import REPO_ROOT, _run_snippet
+from benchmarks.generate_data import write_dataset
+from components.model_imbalance import IMBALANCE_STRATEGIES
+from utils.data_processor import DAILY_FILE
+
+_SNIPPET = """
+import sys, time, json, resource, warnings
+warnings.filterwarnings("ignore")
+sys.path.insert(0, {root!r})
+import numpy as np
+from utils.data_processor import APP_COLUMNS, load_fitbit_data, build_user_table
+from components.model_train import prepare_data, search_xgb_params, find_best_threshold_by_precision
+from components.model_imbalance import imbalance_model_params
+
+df = load_fitbit_data({data!r}, columns=APP_COLUMNS, compact=True, use_cache=False)
+users = build_user_table(df)
+rng = np.random.default_rng({seed})
+holdout_ids = set(rng.choice(users["id"].to_numpy(), size=int(len(users) * 0.2), replace=False).tolist())
+in_holdout = df["id"].isin(holdout_ids)
+holdout = users[users["id"].isin(holdout_ids)]
+train_df = df[~in_holdout]
+setup_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+start = time.perf_counter()
+X_train, X_test, y_train, y_test = prepare_data(train_df, strategy={strategy!r})
+prepare_seconds = time.perf_counter() - start
+
+start = time.perf_counter()
+model, summary = search_xgb_params(X_train, y_train, trial_cache=None,
+                                   model_params=imbalance_model_params({strategy!r}, y_train))
+fit_seconds = time.perf_counter() - start
+
+threshold, val_precision, val_recall = find_best_threshold_by_precision(model, X_test, y_test)
+X_hold = holdout.drop(columns=["CHURNED", "id"])
+y_hold = holdout["CHURNED"].to_numpy()
+pred = model.predict_proba(X_hold)[:, 1] >= threshold
+tp = int((pred & (y_hold == 1)).sum())
+peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({{
+    "seconds": prepare_seconds + fit_seconds,
+    "prepare_seconds": round(prepare_seconds, 4),
+    "fit_seconds": round(fit_seconds, 4),
+    "peak_rss_mb": round(peak_mb, 1),
+    "rss_growth_mb": round(peak_mb - setup_mb, 1),
+    "train_rows": int(len(X_train)),
+    "train_positive_share": round(float(np.mean(np.asarray(y_train) == 1)), 4),
+    "threshold": round(float(threshold), 4),
+    "validation_precision": round(float(val_precision), 4),
+    "holdout_users": int(len(y_hold)),
+    "holdout_precision": round(tp / pred.sum(), 4) if pred.sum() else None,
+    "holdout_recall": round(tp / (y_hold == 1).sum(), 4) if (y_hold == 1).sum() else None,
+    "best_params": summary["best_params"],
+}}))
+"""
+
+
+def run_strategy(strategy, data_dir, seed=42):
+    code = _SNIPPET.format(root=REPO_ROOT, data=os.path.abspath(data_dir), strategy=strategy, seed=seed)
+    return _run_snippet(code, REPO_ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="불균형 처리 방식별 학습 시간/메모리/precision 비교")
+    parser.add_argument("--data", default=None, help="daily CSV 폴더 (없으면 --rows 규모로 합성 데이터 생성)")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workdir", default="bench_data")
+    parser.add_argument("--strategies", default=",".join(IMBALANCE_STRATEGIES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_imbalance.json")
+    args = parser.parse_args()
+
+    data_dir = args.data
+    if data_dir is None:
+        data_dir = os.path.join(args.workdir, f"imbalance_rows_{args.rows}")
+        if not os.path.exists(os.path.join(data_dir, DAILY_FILE)):
+            info = write_dataset(data_dir, args.rows, seed=args.seed)
+            print(f"📦 데이터 생성: {info['rows']:,}행 · {info['users']:,}명")
+
+    result = {
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "data": os.path.abspath(data_dir),
+        "strategies": {},
+    }
+    for strategy in [s for s in args.strategies.split(",") if s]:
+        r = run_strategy(strategy, data_dir, args.seed)
+        result["strategies"][strategy] = r
+        if r.get("seconds") is None:
+            print(f"{strategy:<14} 실패 {' '.join(r.get('errors', []))}")
+        else:
+            print(f"{strategy:<14} prepare {r['prepare_seconds']:.3f}s · fit {r['fit_seconds']:.3f}s · "
+                  f"{r['peak_rss_mb']}MB · 학습 {r['train_rows']:,}행 · threshold {r['threshold']} · "
+                  f"holdout precision {r['holdout_precision']} / recall {r['holdout_recall']}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+데이터 규모별 end-to-end 벤치마크
+- 규모(행 수)마다 benchmarks.generate_data로 합성 데이터를 만들고 (이미 있으면 재사용)
+- 항목마다 새 프로세스에서 준비 단계(setup) 후 측정 대상만 시간/최대 메모리(RSS) 측정
+- 페이지 렌더링은 streamlit AppTest로 측정 (디스크 캐시를 한 번 데운 뒤의 새 프로세스 기준)
+- 결과는 JSON으로 저장, --baseline 으로 이전 커밋 결과와 비교해 회귀 표시
+
+사용 예:
+    python -m benchmarks.run_benchmarks --scales 10000,100000 --output bench_results.json
+    python -m benchmarks.run_benchmarks --scales 1000000 --cases load_csv,cross_val_probs --skip-pages
+    python -m benchmarks.run_benchmarks --baseline bench_results_main.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+
+from benchmarks.cold_start import PAGES, REPO_ROOT, _RENDER_SNIPPET, _run_snippet
+from benchmarks.generate_data import write_dataset
+from utils.data_processor import DAILY_FILE
+
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000]
+DATA_SUBDIR = os.path.join("data", "raw", "lifesnaps", "rais_anonymized", "csv_rais_anonymized")
+
+# ✅ 측정 항목: 이름 → (준비 코드, 측정 코드). 코드는 규모별 디렉터리에서 실행되고 BASE가 CSV 폴더
+_LOAD = "from utils.data_processor import APP_COLUMNS, load_fitbit_data\n" \
+        "df = load_fitbit_data(BASE, columns=APP_COLUMNS, compact=True)"
+CASES = {
+    "load_csv": (
+        "from utils.data_processor import load_fitbit_data",
+        "load_fitbit_data(BASE, use_cache=False)",
+    ),
+    "load_cached": (
+        "from utils.data_processor import load_fitbit_data\nload_fitbit_data(BASE)",
+        "load_fitbit_data(BASE)",
+    ),
+    "load_compact": (
+        "from utils.data_processor import APP_COLUMNS, load_fitbit_data\nload_fitbit_data(BASE)",
+        "load_fitbit_data(BASE, columns=APP_COLUMNS, compact=True)",
+    ),
+    "prepare_care_predict": (
+        _LOAD + "\nfrom components.care_predict import prepare_data",
+        "prepare_data(df)",
+    ),
+    "prepare_model_train": (
+        _LOAD + "\nfrom components.model_train import prepare_data",
+        "prepare_data(df)",
+    ),
+    "prepare_model_compare": (
+        _LOAD + "\nfrom components.model_compare import prepare_data",
+        "prepare_data(df)",
+    ),
+    "temporal_features": (
+        _LOAD + "\nfrom utils.temporal_features import temporal_features",
+        "temporal_features(df)",
+    ),
+    "prepare_model_train_temporal": (
+        _LOAD + "\nfrom components.model_train import prepare_data",
+        "prepare_data(df, temporal=True)",
+    ),
+    "cross_val_probs": (
+        _LOAD + "\nfrom components.care_predict import prepare_data, get_cross_val_probs\n"
+                "_, X, y = prepare_data(df)",
+        "get_cross_val_probs(X, y, use_cache=False)",
+    ),
+    "compare_models": (
+        _LOAD + "\nfrom components.model_compare import split_data, compare_models\nsplit = split_data(df)",
+        "compare_models(*split)",
+    ),
+    "train_xgb_model_with_smote": (
+        _LOAD + "\nfrom components.model_train import TRIAL_CACHE_PATH, train_xgb_model_with_smote\n"
+                "import os\nos.path.exists(TRIAL_CACHE_PATH) and os.remove(TRIAL_CACHE_PATH)",
+        "train_xgb_model_with_smote(df)",
+    ),
+}
+
+_CASE_SNIPPET = """
+import os, sys, time, json, resource, warnings
+warnings.filterwarnings("ignore")
+sys.path.insert(0, {root!r})
+BASE = {base!r}
+{setup}
+setup_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+start = time.perf_counter()
+{stmt}
+elapsed = time.perf_counter() - start
+peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({{"seconds": elapsed, "peak_rss_mb": round(peak_mb, 1),
+                  "rss_growth_mb": round(peak_mb - setup_mb, 1)}}))
+"""
+
+
+def prepare_scale(workdir, rows, seed=42, regenerate=False):
+    # 규모별 실행 디렉터리 (app.py 기본 경로와 같은 구조) + 합성 CSV
+    scale_dir = os.path.join(workdir, f"rows_{rows}")
+    data_dir = os.path.join(scale_dir, DATA_SUBDIR)
+    if regenerate or not os.path.exists(os.path.join(data_dir, DAILY_FILE)):
+        shutil.rmtree(os.path.join(scale_dir, "data", "cache"), ignore_errors=True)
+        info = write_dataset(data_dir, rows, seed=seed)
+        print(f"📦 {rows:,}행 데이터 생성: {info['rows']:,}행 · {info['users']:,}명 · {info['seconds']}s")
+    return scale_dir, data_dir
+
+
+def run_case(name, scale_dir, data_dir):
+    setup, stmt = CASES[name]
+    code = _CASE_SNIPPET.format(root=REPO_ROOT, base=os.path.abspath(data_dir), setup=setup, stmt=stmt)
+    return _run_snippet(code, scale_dir)
+
+
+def run_pages(scale_dir, timeout=600):
+    app_path = os.path.join(REPO_ROOT, "app.py")
+
+    def render(page):
+        return _run_snippet(_RENDER_SNIPPET.format(root=REPO_ROOT, app=app_path, page=page, timeout=timeout),
+                            scale_dir)
+
+    # 프레임/OOF 확률 디스크 캐시를 먼저 채워서 모든 페이지를 같은 조건에서 측정
+    render("예측 결과 - 결과")
+    return {page: render(page) for page in PAGES}
+
+
+def compare(current, baseline, tolerance):
+    # 규모 × 항목별로 시간/최대 메모리가 허용 비율 이상 늘어난 항목
+    regressions = []
+    for scale, results in current.get("scales", {}).items():
+        for name, now in results.items():
+            before = baseline.get("scales", {}).get(scale, {}).get(name, {})
+            for metric in ("seconds", "peak_rss_mb"):
+                if now.get(metric) is None or not before.get(metric):
+                    continue
+                ratio = now[metric] / before[metric]
+                if ratio > 1 + tolerance:
+                    regressions.append({"scale": scale, "name": name, "metric": metric,
+                                        "before": before[metric], "now": now[metric], "ratio": round(ratio, 2)})
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="데이터 규모별 end-to-end 벤치마크")
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)), help="쉼표로 구분한 행 수")
+    parser.add_argument("--cases", default=",".join(CASES), help="쉼표로 구분한 항목 이름")
+    parser.add_argument("--workdir", default="bench_data")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--regenerate", action="store_true")
+    parser.add_argument("--skip-pages", action="store_true")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",") if s]
+    cases = [c for c in args.cases.split(",") if c]
+    unknown = sorted(set(cases) - set(CASES))
+    if unknown:
+        parser.error(f"알 수 없는 항목: {unknown} (가능: {list(CASES)})")
+
+    result = {
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "cpu_count": os.cpu_count(),
+        "scales": {},
+    }
+    for rows in scales:
+        scale_dir, data_dir = prepare_scale(os.path.abspath(args.workdir), rows, args.seed, args.regenerate)
+        scale_result = {}
+        for name in cases:
+            scale_result[name] = run_case(name, scale_dir, data_dir)
+            r = scale_result[name]
+            seconds = "실패" if r.get("seconds") is None else f"{r['seconds']:.3f}s · {r['peak_rss_mb']}MB"
+            print(f"[{rows:,}] {name:<28} {seconds} {' '.join(r.get('errors', []))}")
+        if not args.skip_pages:
+            for page, r in run_pages(scale_dir).items():
+                scale_result[f"page:{page}"] = r
+                seconds = "실패" if r.get("seconds") is None else f"{r['seconds']:.3f}s"
+                print(f"[{rows:,}] page:{page:<23} {seconds} {' '.join(r.get('errors', []))}")
+        result["scales"][str(rows)] = scale_result
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            result["regressions"] = compare(result, json.load(f), args.tolerance)
+        exit_code = 1 if result["regressions"] else 0
+        for r in result["regressions"]:
+            print(f"⚠️ 회귀: [{r['scale']}] {r['name']} {r['metric']} {r['before']} → {r['now']} (x{r['ratio']})")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import os
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from components.model_registry import load_model, get_model_meta
+from components.model_pred import score_frame
+from utils.cache import parquet_available
+from utils.data_processor import assign_risk
+
+
+# ✅ 청크 1개 점수 계산 (워커 스레드에서 실행)
+def _score_chunk(model, chunk, features, id_col):
+    out = pd.DataFrame(index=chunk.index)
+    if id_col in chunk.columns:
+        out[id_col] = chunk[id_col].to_numpy()
+    out["churn_prob"] = score_frame(model, chunk, features, id_col=id_col)
+    out["risk"] = assign_risk(out["churn_prob"]).astype(str)
+    return out.reset_index(drop=True)
+
+
+class _ChunkWriter:
+    """
+    점수 결과를 청크 단위로 이어 쓰기 (Parquet row group, 엔진이 없으면 CSV)
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.use_parquet = output_path.endswith(".parquet") and parquet_available()
+        self._writer = None
+        self._header = True
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+    def write(self, df):
+        if self.use_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.output_path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.output_path, mode="a", header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_in_batches(input_path, output_path, name="churn_model", version=None,
+                     chunksize=100_000, n_jobs=None, id_col="id", verbose=True):
+    """
+    대용량 사용자 피처 CSV를 청크 단위로 읽어 churn_prob / risk를 계산하고 바로 파일에 기록
+    - 모델은 레지스트리에서 한 번만 로드 (프로세스 캐시 재사용)
+    - 동시에 메모리에 올라가는 청크는 최대 n_jobs * 2개 → 입력 크기와 무관하게 메모리 상한 고정
+    - 출력 순서는 입력 순서와 동일
+    반환: 처리 행 수 / 소요 시간 / 초당 처리 행 수
+    """
+    model = load_model(name, version)
+    features = get_model_meta(name, version).get("features")
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    usecols = None
+    if features:
+        usecols = lambda c: c in features or c == id_col
+
+    writer = _ChunkWriter(output_path)
+    rows = 0
+    start = time.perf_counter()
+    pending = deque()
+
+    def _drain(limit):
+        nonlocal rows
+        while len(pending) > limit:
+            result = pending.popleft().result()
+            writer.write(result)
+            rows += len(result)
+            if verbose:
+                elapsed = time.perf_counter() - start
+                print(f"📦 {rows:,}행 처리 ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+
+    try:
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            for chunk in pd.read_csv(input_path, chunksize=chunksize, usecols=usecols):
+                pending.append(pool.submit(_score_chunk, model, chunk, features, id_col))
+                _drain(n_jobs * 2)
+            _drain(0)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed > 0 else None,
+        "output": output_path,
+        "format": "parquet" if writer.use_parquet else "csv",
+    }
+    if verbose:
+        print(f"✅ 배치 스코어링 완료: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="레지스트리 모델로 사용자 전체 배치 스코어링")
+    parser.add_argument("input_path")
+    parser.add_argument("output_path")
+    parser.add_argument("--name", default="churn_model")
+    parser.add_argument("--version", default=None)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--n-jobs", type=int, default=None)
+    args = parser.parse_args()
+    score_in_batches(args.input_path, args.output_path, name=args.name, version=args.version,
+                     chunksize=args.chunksize, n_jobs=args.n_jobs)
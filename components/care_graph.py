@@ -4,30 +4,14 @@ from xgboost import XGBClassifier
 from sklearn.metrics import f1_score
 import plotly.express as px
 from components.model_train import prepare_data, train_xgb_model_with_smote
-
-# 문자열 나이 변환 함수
-def convert_age_to_numeric(age_str):
-    try:
-        if isinstance(age_str, str):
-            if '<' in age_str:
-                return int(age_str.replace('<', '')) - 1
-            elif '>' in age_str:
-                return int(age_str.replace('>', '')) + 1
-            elif '-' in age_str:
-                a, b = age_str.split('-')
-                return (int(a) + int(b)) // 2
-            else:
-                return int(age_str)
-        return age_str
-    except:
-        return None
+from utils.data_processor import parse_age_series
 
 # 메인 함수
 def show_healthcare_graph(df):
     try:
         # ✅ 나이 변환
         if "나이" not in df.columns and "age" in df.columns:
-            df["나이"] = df["age"].apply(convert_age_to_numeric)
+            df["나이"] = parse_age_series(df["age"])
 
         df["나이"] = pd.to_numeric(df["나이"], errors="coerce")
 
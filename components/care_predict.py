@@ -1,55 +1,162 @@
+import os
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
 import numpy as np
-from sklearn.model_selection import StratifiedKFold
-from xgboost import XGBClassifier
+from importlib.metadata import version as package_version
+from concurrent.futures import ThreadPoolExecutor
+
+# sklearn/xgboost/matplotlib은 실제로 학습·그리기가 필요할 때만 import (캐시 적중 시 로드 안 함)
+from components.figure_cache import figure_key, render_figure
+from components.plot_font import use_korean_font
+from utils.cache import CACHE_DIR, atomic_write, frame_fingerprint, params_fingerprint, remove_stale
+from utils.data_processor import BASE_COLS, RISK_LABELS, assign_risk, build_user_table, user_feature_columns
+from utils.segments import build_segment_cube, segment_query
+from utils.profiling import span
+
+# ✅ 이탈 확률 모델 파라미터 (캐시 키에도 포함)
+XGB_PARAMS = {"use_label_encoder": False, "eval_metric": "logloss", "random_state": 42,
+              "tree_method": "hist"}
+MAX_BIN = 256
+CV_CACHE_DIR = os.path.join(CACHE_DIR, "cv_probs")
+CV_CACHE_PREFIX = "cv_probs_"
+
+
+# ✅ 교차검증 결과 캐시 키: 사용자 피처 행렬 + 라벨 + fold seed + 모델 파라미터
+def _cv_cache_key(X, y, n_splits, random_state, params):
+    return frame_fingerprint(X, y) + "_" + params_fingerprint(
+        n_splits=n_splits, random_state=random_state, params=params,
+        xgboost=package_version("xgboost")
+    )
+
+
+# ✅ 사용자 행렬 전체를 한 번만 분위수 bin 코드로 양자화
+def quantize_features(X, max_bin=MAX_BIN):
+    """
+    컬럼마다 전체 데이터 기준 분위수 경계를 한 번 계산해 bin 코드(float32)로 변환
+    - 고유값이 max_bin 이하인 컬럼은 고유값 순위를 그대로 코드로 사용 (정보 손실 없음)
+    - fold마다 X.iloc[...]로 복사 후 재-binning 하지 않고 코드 배열을 인덱싱만 함
+    """
+    values = X.to_numpy(dtype=np.float64)
+    codes = np.full(values.shape, np.nan, dtype=np.float32)
+    for j in range(values.shape[1]):
+        col = values[:, j]
+        known = ~np.isnan(col)
+        uniq = np.unique(col[known])
+        if len(uniq) <= max_bin:
+            codes[known, j] = np.searchsorted(uniq, col[known])
+        else:
+            cuts = np.unique(np.quantile(col[known], np.linspace(0, 1, max_bin + 1)[1:-1]))
+            codes[known, j] = np.searchsorted(cuts, col[known], side="right")
+    return codes
+
+
+# ✅ fold 1개 학습 → 검증 구간 확률 반환 (병렬 실행 단위)
+def _fit_fold(codes, labels, train_idx, val_idx, params):
+    from xgboost import XGBClassifier
+    model = XGBClassifier(**params)
+    model.fit(codes[train_idx], labels[train_idx])
+    return val_idx, model.predict_proba(codes[val_idx])[:, 1]
 
 
 # ✅ 교차검증 기반 이탈 확률 함수
-def get_cross_val_probs(X, y, n_splits=5):
-    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+def get_cross_val_probs(X, y, n_splits=5, random_state=42, n_jobs=None,
+                        use_cache=True, cache_dir=CV_CACHE_DIR):
+    """
+    StratifiedKFold out-of-fold 이탈 확률 계산
+    - n_jobs: 동시에 학습할 fold 수 (None/-1 이면 CPU 코어 수만큼)
+    - hist 트리는 스레드 수와 무관하게 결정적이므로 n_jobs가 달라도 같은 seed면 결과가 비트 단위로 동일
+    """
+    params = dict(XGB_PARAMS, max_bin=MAX_BIN)
+
+    # 🔹 같은 입력으로 이미 계산한 out-of-fold 확률이 있으면 재학습 없이 로드
+    cache_file = None
+    if use_cache:
+        cache_name = CV_CACHE_PREFIX + _cv_cache_key(X, y, n_splits, random_state, params)
+        cache_file = os.path.join(cache_dir, cache_name + ".npy")
+        if os.path.exists(cache_file):
+            try:
+                probs = np.load(cache_file)
+                if len(probs) == len(X):
+                    return probs
+            except (OSError, ValueError):
+                pass
+
+    from sklearn.model_selection import StratifiedKFold
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
     probs = np.zeros(len(X))
 
-    for train_idx, val_idx in skf.split(X, y):
-        model = XGBClassifier(use_label_encoder=False, eval_metric="logloss", random_state=42)
-        model.fit(X.iloc[train_idx], y.iloc[train_idx])
-        probs[val_idx] = model.predict_proba(X.iloc[val_idx])[:, 1]
+    # 🔹 양자화는 한 번만, fold는 코드 배열 인덱싱으로 분할
+    with span("cv.quantize", rows=len(X)):
+        codes = quantize_features(X, max_bin=MAX_BIN)
+    labels = np.asarray(y)
+
+    cpu_count = os.cpu_count() or 1
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = cpu_count
+    n_jobs = max(1, min(n_jobs, n_splits))
+    # 🔹 fold 병렬 × 모델 내부 스레드가 코어 수를 넘지 않도록 분배
+    params["n_jobs"] = max(1, cpu_count // n_jobs)
+
+    folds = list(skf.split(codes, labels))
+    with span("cv.fit_folds", folds=n_splits, n_jobs=n_jobs):
+        if n_jobs == 1:
+            results = [_fit_fold(codes, labels, tr, va, params) for tr, va in folds]
+        else:
+            # XGBoost 학습은 GIL을 놓으므로 스레드로 충분 (행렬 복사 없이 공유)
+            with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+                results = list(pool.map(lambda f: _fit_fold(codes, labels, f[0], f[1], params), folds))
+
+    for val_idx, fold_probs in results:
+        probs[val_idx] = fold_probs
+
+    if cache_file is not None:
+        # 데이터/파라미터가 바뀌어 더는 쓰지 않는 이전 결과는 정리 (parquet 캐시의 remove_stale과 같은 방식)
+        remove_stale(cache_dir, CV_CACHE_PREFIX, keep=cache_name)
+
+        def _save(tmp):
+            with open(tmp, "wb") as f:
+                np.save(f, probs)
+        atomic_write(cache_file, _save)
 
     return probs
 
-# ✅ 이탈 조건 정의 함수
-def prepare_data(df):
-    base_cols = ["steps", "calories", "very_active_minutes", "moderately_active_minutes", "distance"]
-    df = df.dropna(subset=base_cols + ["id"])
-    df_user = df.groupby("id")[base_cols].mean().reset_index()
-
-    score = 0
-    score += (df_user["steps"] < 6400).astype(int)
-    score += (df_user["calories"] < 1800).astype(int)
-    score += (df_user["very_active_minutes"] < 6).astype(int) * 2
-    score += (df_user["moderately_active_minutes"] < 8).astype(int)
-    score += (df_user["distance"] < 4600).astype(int)
-    df_user["CHURNED"] = (score >= 4).astype(int)
-
-    return df_user, df_user[base_cols], df_user["CHURNED"]
+# ✅ 이탈 조건 정의 함수 (일 단위 df 또는 stream_user_table 결과 모두 가능)
+def prepare_data(df, temporal=False):
+    # temporal=True: 평균 + 시계열 피처 (utils.temporal_features), 캐시 키는 X로 만들어지므로 따로 구분됨
+    df_user = build_user_table(df, temporal=temporal)
+    return df_user, df_user[user_feature_columns(df_user)], df_user["CHURNED"]
+
+# ✅ 이탈 확률 분포 히스토그램
+def _draw_prob_hist(probs):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    use_korean_font()
+    fig, ax = plt.subplots()
+    sns.histplot(probs, bins=20, kde=True, color="skyblue", ax=ax)
+    ax.set_title("예측된 이탈 확률 분포")
+    return fig
 
 # ✅ 메인 함수 (교차검증 확률 사용)
-def show_prediction_summary(df):
+def show_prediction_summary(df, df_user=None, cube=None):
     st.header("📊 이용자 이탈 예측 결과")
 
-    df_user, X, y = prepare_data(df)
+    # 파이프라인에서 이미 계산한 df_user(churn_prob, risk 포함)를 받으면 재계산하지 않음
+    if df_user is None or "risk" not in df_user.columns:
+        df_user, X, y = prepare_data(df)
 
-    # ❗ 기존 train_test_split + model 제거하고 교차검증 확률 사용
-    churn_probs = get_cross_val_probs(X, y)
-    df_user["churn_prob"] = churn_probs
+        # ❗ 기존 train_test_split + model 제거하고 교차검증 확률 사용
+        df_user["churn_prob"] = get_cross_val_probs(X, y)
 
-    # 위험군 분류
-    df_user["risk"] = pd.cut(df_user["churn_prob"],
-                             bins=[-0.01, 0.3, 0.7, 1.01],
-                             labels=["저위험", "중위험", "고위험"])
+        # 위험군 분류
+        df_user["risk"] = assign_risk(df_user["churn_prob"])
+        cube = None
+
+    # 위험군별 인원/평균은 세그먼트 큐브에서 조회 (df_user 재스캔 없음)
+    # cube/df_user는 사용자당 1행(성별/나이 병합 전 risk 단계)이어야 인원이 중복 집계되지 않음
+    if cube is None or "risk" not in cube.index.names:
+        cube = build_segment_cube(df_user)
+    by_risk = segment_query(cube, by=["risk"]).reindex(RISK_LABELS)
+    by_risk["n"] = by_risk["n"].fillna(0).astype("int64")
+    total = int(by_risk["n"].sum())
 
     # 색상 및 라벨 정의
     color_map = {"고위험": "red", "중위험": "orange", "저위험": "green"}
@@ -63,9 +170,8 @@ def show_prediction_summary(df):
     st.subheader("📌 위험군 분포")
     cols = st.columns(3)
     for i, level in enumerate(["고위험", "중위험", "저위험"]):
-        group = df_user[df_user["risk"] == level]
-        count = len(group)
-        percent = round((count / len(df_user)) * 100, 2)
+        count = int(by_risk.at[level, "n"])
+        percent = round((count / total) * 100, 2) if total else 0.0
         with cols[i]:
             st.markdown(f"""
                 <div style='border:2px solid {color_map[level]}; padding: 15px; border-radius: 8px; text-align:center'>
@@ -81,13 +187,12 @@ def show_prediction_summary(df):
 
     # 📋 평균 테이블
     st.markdown("### 📋 위험군별 평균 활동량")
-    mean_table = df_user.groupby("risk")[["steps", "calories", "very_active_minutes",
-                                          "moderately_active_minutes", "distance"]].mean().round(2)
+    mean_table = by_risk[[f"{c}_mean" for c in BASE_COLS]].round(2)
+    mean_table.columns = BASE_COLS
     st.dataframe(mean_table)
 
     # 📈 확률 분포
     st.markdown("### 📈 전체 이탈 확률 분포")
-    fig, ax = plt.subplots()
-    sns.histplot(df_user["churn_prob"], bins=20, kde=True, color="skyblue")
-    ax.set_title("예측된 이탈 확률 분포")
-    st.pyplot(fig)
\ No newline at end of file
+    probs = df_user["churn_prob"].rename("churn_prob")
+    key = figure_key("churn_prob_hist", probs, bins=20, kde=True, color="skyblue")
+    st.image(render_figure(key, lambda: _draw_prob_hist(probs)), use_container_width=True)
\ No newline at end of file
@@ -1,56 +1,67 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import re
-import time
-import platform
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
-import matplotlib.pyplot as plt
+from components.message_dispatch import get_dispatcher
+from utils.profiling import span
 import warnings
 warnings.filterwarnings("ignore")
 
-# ✅ 한글 폰트 설정
-if platform.system() == "Darwin":
-    plt.rcParams['font.family'] = 'AppleGothic'
-elif platform.system() == "Windows":
-    plt.rcParams['font.family'] = 'Malgun Gothic'
-else:
-    plt.rcParams['font.family'] = 'NanumGothic'
-plt.rcParams['axes.unicode_minus'] = False
-
-
-# ✅ 문자열 나이를 평균 나이(int)로 변환
-def convert_age_to_int(age_str):
-    try:
-        if pd.isnull(age_str): return None
-        if isinstance(age_str, (int, float)): return int(age_str)
-        age_str = str(age_str).strip()
-        if re.match(r"^\d{2}$", age_str): return int(age_str)
-        if re.match(r"^\d{2}s?$", age_str): return int(age_str[:2]) + 5
-        if re.match(r"^<\d+$", age_str): return int(age_str[1:]) - 1
-        if re.match(r"^>=\d+$", age_str): return int(age_str[2:]) + 2
-        if re.match(r"^<=\d+$", age_str): return int(age_str[2:]) - 2
-        if re.match(r"^\d{2}[-~]\d{2}$", age_str):
-            parts = re.split("[-~]", age_str)
-            return (int(parts[0]) + int(parts[1])) // 2
-    except:
+
+PAGE_SIZE_OPTIONS = [50, 100, 200, 500]
+
+
+# ✅ 서버(pandas)에서 정렬/검색/페이지 자르기 → 화면에는 현재 페이지 행만 전달
+def paginate_users(df, sort_by=None, ascending=False, query="", page=1, page_size=100):
+    """
+    반환: (현재 페이지 DataFrame, 조건에 맞는 전체 행 수, 전체 페이지 수)
+    """
+    if query:
+        df = df[df["id"].astype(str).str.contains(query, case=False, regex=False, na=False)]
+
+    total = len(df)
+    total_pages = max(1, -(-total // page_size))
+    page = min(max(1, int(page)), total_pages)
+    start = (page - 1) * page_size
+
+    if sort_by in df.columns:
+        # 안정 정렬 (같은 값은 원래 순서 유지), 결측치는 항상 마지막
+        df = df.sort_values(sort_by, ascending=ascending, kind="stable", na_position="last")
+    page_df = df.iloc[start:start + page_size]
+
+    return page_df.reset_index(drop=True), total, total_pages
+
+
+# ✅ 페이지를 넘겨도 유지되는 선택 상태 (id 집합)
+def _selection():
+    return st.session_state.setdefault("selected_user_ids", set())
+
+
+def _selected_ids_from_grid(grid_response):
+    # 그리드가 아직 값을 돌려주지 않은 첫 렌더링이면 None (기존 선택 유지)
+    # 값이 온 뒤 selected_rows가 None이면 마지막 선택까지 해제된 것 → 빈 집합
+    raw = getattr(grid_response, "grid_response", grid_response)
+    if not isinstance(raw, dict) or "nodes" not in raw:
         return None
-    return None
+    selected = grid_response.get("selected_rows", None)
+    if selected is None:
+        return set()
+    if isinstance(selected, pd.DataFrame):
+        return set(selected["id"].tolist()) if not selected.empty else set()
+    return {row.get("id") for row in selected}
 
 
 # ✅ 이탈 위험 사용자 분류 및 문자 발송
 def show_prediction_graphs(df_user):
     st.subheader("📊 이탈 위험 사용자 분류 및 관리")
 
-    df_user = df_user.copy()
-
     if "churn_prob" not in df_user.columns or "risk" not in df_user.columns:
         st.warning("이탈 예측 결과가 포함된 DataFrame을 입력해주세요 (churn_prob, risk 컬럼 필요)")
         return
 
     # 1. 필터
     selected_risk = st.selectbox("🧪 위험 등급 선택", ["고위험", "중위험", "저위험"])
-    filtered = df_user[df_user["risk"] == selected_risk].reset_index(drop=True)
+    filtered = df_user[(df_user["risk"] == selected_risk).to_numpy()]
 
     if filtered.empty:
         st.warning(f"'{selected_risk}' 그룹에 해당하는 사용자가 없습니다.")
@@ -58,28 +69,70 @@ def show_prediction_graphs(df_user):
 
     st.markdown(f"### 🔍 {selected_risk} 이용자 목록")
 
-    # 2. 체크박스 테이블 생성
-    gb = GridOptionsBuilder.from_dataframe(filtered)
-    gb.configure_selection("multiple", use_checkbox=True, pre_selected_rows=[])
+    # 2. 정렬/검색/페이지 설정 (모두 서버에서 처리)
+    c1, c2, c3, c4, c5 = st.columns([2, 2, 1, 1, 1])
+    with c1:
+        query = st.text_input("ID 검색", "")
+    with c2:
+        sort_by = st.selectbox("정렬 기준", list(filtered.columns),
+                               index=list(filtered.columns).index("churn_prob"))
+    with c3:
+        ascending = st.checkbox("오름차순", value=False)
+    with c4:
+        page_size = st.selectbox("페이지 크기", PAGE_SIZE_OPTIONS, index=1)
+    with c5:
+        page = st.number_input("페이지", min_value=1, value=1, step=1)
+
+    with span("grid.paginate", rows=len(filtered)):
+        page_df, total, total_pages = paginate_users(filtered, sort_by, ascending, query, page, page_size)
+    st.caption(f"총 {total:,}명 · {min(int(page), total_pages)}/{total_pages} 페이지")
+
+    selection = _selection()
+
+    # 🔹 일괄 선택/해제 (그리드를 다시 만들어 선택 상태를 반영하도록 버전 증가)
+    b1, b2, b3 = st.columns([1, 1, 3])
+    with b1:
+        if st.button("검색 결과 전체 선택", use_container_width=True):
+            ids = filtered["id"]
+            if query:
+                ids = ids[ids.astype(str).str.contains(query, case=False, regex=False, na=False)]
+            selection.update(ids.tolist())
+            st.session_state["selection_version"] = st.session_state.get("selection_version", 0) + 1
+    with b2:
+        if st.button("선택 해제", use_container_width=True):
+            selection.clear()
+            st.session_state["selection_version"] = st.session_state.get("selection_version", 0) + 1
+
+    # 3. 체크박스 테이블 (현재 페이지만 전송, 이전 선택 복원)
+    gb = GridOptionsBuilder.from_dataframe(page_df)
+    pre_selected = [i for i, uid in enumerate(page_df["id"]) if uid in selection]
+    gb.configure_selection("multiple", use_checkbox=True, pre_selected_rows=pre_selected)
     grid_options = gb.build()
 
-    grid_response = AgGrid(
-        filtered,
-        gridOptions=grid_options,
-        update_mode=GridUpdateMode.SELECTION_CHANGED,
-        fit_columns_on_grid_load=True,
-        theme='streamlit',
-        allow_unsafe_jscode=True,
-        height=400
-    )
-
-    selected = grid_response.get("selected_rows", pd.DataFrame())
-
-    # ⛑ 안전한 selected 처리
-    if isinstance(selected, pd.DataFrame) and not selected.empty:
-        selected_ids = selected["id"].tolist()
-    else:
-        selected_ids = []
+    grid_key = "_".join(map(str, [selected_risk, sort_by, ascending, query, page_size, page,
+                                  st.session_state.get("selection_version", 0)]))
+    with span("grid.render", rows=len(page_df)):
+        grid_response = AgGrid(
+            page_df,
+            gridOptions=grid_options,
+            update_mode=GridUpdateMode.SELECTION_CHANGED,
+            fit_columns_on_grid_load=True,
+            theme='streamlit',
+            allow_unsafe_jscode=True,
+            height=400,
+            key=f"risk_grid_{grid_key}"
+        )
+
+    # ⛑ 현재 페이지의 선택 결과만 반영하고 다른 페이지 선택은 유지
+    page_selected = _selected_ids_from_grid(grid_response)
+    if page_selected is not None:
+        selection.difference_update(set(page_df["id"]))
+        selection.update(page_selected)
+
+    with b3:
+        st.caption(f"✔️ 선택된 이용자: {len(selection):,}명 (페이지를 넘겨도 유지)")
+
+    selected_ids = sorted(selection, key=str)
 
     # 3. 문자 발송 섹션
     st.markdown("---")
@@ -98,8 +151,32 @@ def show_prediction_graphs(df_user):
         elif not msg.strip():
             st.error("❗ 문자 내용을 입력해주세요.")
         else:
-            with st.spinner("📡 문자 발송 중..."):
-                time.sleep(2)
-            st.success("✅ 문자가 정상적으로 발송되었습니다!")
-            st.info(f"📨 보낸 내용: {msg}")
-            st.markdown(f"🧾 총 **{len(selected_ids)}명**에게 발송 완료되었습니다.")
+            job_id = get_dispatcher().submit(selected_ids, msg)
+            st.session_state.setdefault("dispatch_jobs", []).append(job_id)
+            st.success(f"✅ 발송 요청이 접수되었습니다! (작업 ID: {job_id})")
+            st.info(f"📨 보낼 내용: {msg}")
+            st.markdown(f"🧾 총 **{len(selected_ids):,}명** 발송 대기열 등록 — 백그라운드에서 발송됩니다.")
+
+    _show_dispatch_status()
+
+
+# ✅ 발송 작업 진행 현황 (최근 작업 순)
+def _show_dispatch_status(limit=5):
+    job_ids = st.session_state.get("dispatch_jobs", [])
+    if not job_ids:
+        return
+    dispatcher = get_dispatcher()
+    st.markdown("#### 📡 발송 진행 현황")
+    st.button("🔄 상태 새로고침")
+    for job_id in reversed(job_ids[-limit:]):
+        status = dispatcher.job_status(job_id)
+        if status is None:
+            continue
+        processed = status["sent"] + status["failed"]
+        label = "완료" if status["done"] else "발송 중"
+        st.progress(processed / status["total"] if status["total"] else 1.0,
+                    text=f"[{job_id}] {label} — {processed:,} / {status['total']:,}")
+        st.caption(
+            f"성공 {status['sent']:,}건 · 실패 {status['failed']:,}건 · 재시도 {status['retries']:,}회 · "
+            f"{status['messages_per_sec']:,}건/초 · {status['elapsed_sec']}초"
+        )
@@ -1,29 +1,22 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import re
 import warnings
 
+from utils.data_processor import parse_age_series
+from utils.profiling import span
+
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
-# ✅ 나이 문자열 처리 함수
-def convert_age_to_int(age_str):
-    try:
-        if pd.isnull(age_str): return None
-        if isinstance(age_str, (int, float)): return int(age_str)
-        age_str = str(age_str).strip()
-        if re.match(r"^\d{2}$", age_str): return int(age_str)
-        if re.match(r"^\d{2}s?$", age_str): return int(age_str[:2]) + 5
-        if re.match(r"^<\d+$", age_str): return int(age_str[1:]) - 1
-        if re.match(r"^>=\d+$", age_str): return int(age_str[2:]) + 2
-        if re.match(r"^<=\d+$", age_str): return int(age_str[2:]) - 2
-        if re.match(r"^\d{2}[-~]\d{2}$", age_str):
-            parts = re.split("[-~]", age_str)
-            return (int(parts[0]) + int(parts[1])) // 2
-    except:
-        return None
-
-# ✅ 이탈 위험 등급 변환 함수
+# ✅ 이탈 위험 등급 (표시용: 0.3 / 0.7 이상이면 한 단계 위)
+RISK_DISPLAY_CUTS = [0.3, 0.7]
+RISK_DISPLAY_LABELS = np.array(["🟢 저위험", "🟠 중위험", "🔴 고위험"], dtype=object)
+AGE_BINS = [0, 29, 39, 49, 59, 150]
+AGE_LABELS = ["20대", "30대", "40대", "50대", "60대 이상"]
+PAGE_SIZE_OPTIONS = [50, 100, 200, 500]
+
+
+# ✅ 이탈 위험 등급 변환 함수 (단일 값)
 def get_risk_label(prob):
     if prob >= 0.7:
         return f"🔴 고위험 {prob * 100:.1f}%"
@@ -32,48 +25,66 @@ def get_risk_label(prob):
     else:
         return f"🟢 저위험 {prob * 100:.1f}%"
 
-# ✅ 메인 함수
-def show_user_data(df_user):
-    st.subheader("📋 이용자 데이터")
 
-    age_options = ["전체", "20대", "30대", "40대", "50대", "60대 이상"]
-    selected_age = st.selectbox("연령선택", age_options)
+def risk_labels(probs):
+    """
+    get_risk_label의 벡터화 버전: 확률 Series → "🔴 고위험 83.2%" 형태 Series
+    """
+    probs = pd.Series(probs, dtype="float64").fillna(0.0)
+    levels = np.searchsorted(RISK_DISPLAY_CUTS, probs.to_numpy(), side="right")
+    percents = (probs * 100).round(1).map("{:.1f}%".format)
+    return pd.Series(RISK_DISPLAY_LABELS[levels], index=probs.index) + " " + percents
 
-    # 🔄 데이터 복사
-    df = df_user.copy()
 
-    # 연령대 생성
-    df["age"] = df["age"].apply(convert_age_to_int)
-    df = df.dropna(subset=["age"])
-    df["age"] = df["age"].astype(int)
-    df["age_group"] = pd.cut(
-        df["age"],
-        bins=[0, 29, 39, 49, 59, 150],
-        labels=["20대", "30대", "40대", "50대", "60대 이상"]
-    )
+def build_user_display(df_user, age_group="전체"):
+    """
+    이용자 테이블 → 표시용 테이블 (컬럼 연산만 사용, 이탈가능성은 숫자 그대로)
+    위험 등급 문자열은 화면에 보이는 페이지에서만 risk_labels로 만듦
+    """
+    age = parse_age_series(df_user["age"])
+    keep = age.notna().to_numpy()
+    df = df_user.loc[keep]
+    age = age[keep].astype(int)
 
-    # 평균 운동시간 계산
-    df["평균운동시간"] = df[["very_active_minutes", "moderately_active_minutes"]].mean(axis=1).round(1)
+    groups = pd.cut(age, bins=AGE_BINS, labels=AGE_LABELS)
+    if age_group != "전체":
+        match = (groups == age_group).to_numpy()
+        df, age = df.loc[match], age[match]
 
+    index = df.index
+    result = pd.DataFrame({
+        "ID": df["id"] if "id" in df else pd.Series("ID_" + index.astype(str), index=index),
+        "성별": df["gender"] if "gender" in df else "미확인",
+        "나이": age,
+        "평균운동시간": df[["very_active_minutes", "moderately_active_minutes"]].mean(axis=1).round(1),
+        "이탈가능성": df["churn_prob"] if "churn_prob" in df else 0.0,
+    }, index=index)
+    return result.reset_index(drop=True)
 
-    # ✅ 필터 적용
-    if selected_age != "전체":
-        df = df[df["age_group"] == selected_age]
 
+# ✅ 메인 함수
+def show_user_data(df_user):
+    st.subheader("📋 이용자 데이터")
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    with c1:
+        selected_age = st.selectbox("연령선택", ["전체"] + AGE_LABELS)
+    with c2:
+        page_size = st.selectbox("페이지 크기", PAGE_SIZE_OPTIONS, index=1, key="user_data_page_size")
+    with c3:
+        page = st.number_input("페이지", min_value=1, value=1, step=1, key="user_data_page")
+
+    with span("user_data.build", rows=len(df_user)):
+        df = build_user_display(df_user, selected_age)
     if df.empty:
         st.warning("🔍 조건에 해당하는 사용자가 없습니다.")
         return
 
-    # ✅ 결과 구성
-    display_data = []
-    for idx, row in df.iterrows():
-        display_data.append({
-            "ID": row.get("id", f"ID_{idx}"),
-            "성별": row.get("gender", "미확인"),
-            "나이": row.get("age", "N/A"),
-            "평균운동시간": row.get("평균운동시간", "N/A"),
-            "이탈가능성": get_risk_label(row.get("churn_prob", 0.0))
-        })
-
-    result_df = pd.DataFrame(display_data)
-    st.dataframe(result_df, use_container_width=True)
+    # ✅ 현재 페이지만 잘라서 등급 문자열 생성 후 출력
+    total_pages = max(1, -(-len(df) // page_size))
+    page = min(int(page), total_pages)
+    page_df = df.iloc[(page - 1) * page_size: page * page_size].copy()
+    page_df["이탈가능성"] = risk_labels(page_df["이탈가능성"])
+
+    st.caption(f"총 {len(df):,}명 · {page}/{total_pages} 페이지")
+    st.dataframe(page_df, use_container_width=True, hide_index=True)
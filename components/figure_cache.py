@@ -0,0 +1,69 @@
+import io
+import threading
+from collections import OrderedDict
+
+from utils.cache import frame_fingerprint, params_fingerprint
+from utils.profiling import span
+
+# ✅ 렌더링된 그래프(PNG 바이트) 캐시: 프로세스 전역, 전체 바이트 수 기준 LRU 제거
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+SAVEFIG_OPTIONS = {"format": "png", "bbox_inches": "tight", "dpi": 200}
+
+_cache = OrderedDict()
+_cache_bytes = 0
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_lock = threading.Lock()
+
+
+def figure_key(name, *frames, **params):
+    """
+    그래프 이름 + 입력 집계 데이터 지문 + 그리기 파라미터 → 캐시 키
+    """
+    return f"{name}:{frame_fingerprint(*frames)}:{params_fingerprint(**params)}"
+
+
+def render_figure(key, draw, max_bytes=MAX_CACHE_BYTES):
+    """
+    key가 캐시에 있으면 저장된 PNG 바이트 반환, 없으면 draw()로 Figure를 만들어 PNG로 변환 후 저장
+    draw: 인자 없이 matplotlib Figure를 반환하는 함수
+    """
+    global _cache_bytes
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return _cache[key]
+        _stats["misses"] += 1
+
+    with span("figure.render", figure=key.split(":", 1)[0]):
+        import matplotlib.pyplot as plt
+        fig = draw()
+        buf = io.BytesIO()
+        fig.savefig(buf, **SAVEFIG_OPTIONS)
+        plt.close(fig)
+        png = buf.getvalue()
+
+    with _lock:
+        if key not in _cache:
+            _cache[key] = png
+            _cache_bytes += len(png)
+        while _cache_bytes > max_bytes and len(_cache) > 1:
+            _, old = _cache.popitem(last=False)
+            _cache_bytes -= len(old)
+            _stats["evictions"] += 1
+    return png
+
+
+def figure_cache_stats():
+    """
+    캐시 적중/미적중/제거 횟수 + 현재 저장 개수/용량
+    """
+    with _lock:
+        return dict(_stats, entries=len(_cache), megabytes=round(_cache_bytes / 1024 ** 2, 2))
+
+
+def clear_figure_cache():
+    global _cache_bytes
+    with _lock:
+        _cache.clear()
+        _cache_bytes = 0
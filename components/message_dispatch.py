@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+import threading
+
+# ✅ 발송 로그 (메시지 1건당 1줄 JSONL)
+DISPATCH_LOG_PATH = "data/dispatch/delivery_log.jsonl"
+
+
+class MessageProvider:
+    """
+    문자 발송 공급자 인터페이스
+    send_batch(messages)는 messages와 같은 순서로 (성공 여부, 오류 메시지) 목록을 반환
+    """
+    name = "base"
+    max_batch_size = 100
+
+    async def send_batch(self, messages):
+        raise NotImplementedError
+
+
+class StubProvider(MessageProvider):
+    """
+    테스트용 로컬 공급자: 실제 발송 없이 지연시간/실패율만 흉내냄
+    """
+    name = "stub"
+
+    def __init__(self, max_batch_size=100, latency_ms=50, failure_rate=0.0, seed=None):
+        self.max_batch_size = max_batch_size
+        self.latency = latency_ms / 1000
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self.sent = 0
+
+    async def send_batch(self, messages):
+        await asyncio.sleep(self.latency)
+        results = []
+        for _ in messages:
+            if self._random.random() < self.failure_rate:
+                results.append((False, "stub: 일시적 발송 실패"))
+            else:
+                self.sent += 1
+                results.append((True, None))
+        return results
+
+
+class _RateLimiter:
+    # 토큰 버킷: 초당 rate건, 최대 burst건까지 몰아서 허용
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, n):
+        if not self.rate:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n or (self.tokens >= self.capacity and n > self.capacity):
+                    self.tokens -= n
+                    return
+                await asyncio.sleep((n - self.tokens) / self.rate)
+
+
+class DispatchQueue:
+    """
+    백그라운드 스레드의 asyncio 루프에서 발송 작업을 처리하는 큐
+    - submit()은 바로 job_id를 반환 (Streamlit 화면을 막지 않음)
+    - 공급자 배치 크기 단위로 묶어서 발송, 초당 발송 수 제한, 실패 건은 지수 백오프로 재시도
+    - 메시지마다 최종 결과를 JSONL 로그에 기록
+    """
+
+    def __init__(self, provider=None, rate_per_sec=1000, concurrency=8, max_retries=3,
+                 backoff_base=0.5, log_path=DISPATCH_LOG_PATH):
+        self.provider = provider or StubProvider()
+        self.rate_per_sec = rate_per_sec
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.log_path = log_path
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="dispatch-queue", daemon=True)
+        self._thread.start()
+        self._limiter = None
+        self._semaphore = None
+        asyncio.run_coroutine_threadsafe(self._init_primitives(), self._loop).result()
+
+    async def _init_primitives(self):
+        self._limiter = _RateLimiter(self.rate_per_sec)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    def submit(self, user_ids, text):
+        job_id = uuid.uuid4().hex[:12]
+        user_ids = list(user_ids)
+        with self._lock:
+            self.jobs[job_id] = {
+                "job_id": job_id, "total": len(user_ids), "sent": 0, "failed": 0, "retries": 0,
+                "submitted_at": time.time(), "finished_at": None, "provider": self.provider.name,
+            }
+        asyncio.run_coroutine_threadsafe(self._run_job(job_id, user_ids, text), self._loop)
+        return job_id
+
+    def job_status(self, job_id):
+        with self._lock:
+            job = dict(self.jobs.get(job_id, {}))
+        if not job:
+            return None
+        end = job["finished_at"] or time.time()
+        elapsed = max(end - job["submitted_at"], 1e-9)
+        done = job["sent"] + job["failed"]
+        job.update(
+            pending=job["total"] - done,
+            done=job["finished_at"] is not None,
+            elapsed_sec=round(elapsed, 2),
+            messages_per_sec=round(done / elapsed, 1),
+        )
+        return job
+
+    def _update(self, job_id, **deltas):
+        with self._lock:
+            job = self.jobs[job_id]
+            for key, value in deltas.items():
+                job[key] += value
+
+    async def _run_job(self, job_id, user_ids, text):
+        size = self.provider.max_batch_size
+        batches = [user_ids[i:i + size] for i in range(0, len(user_ids), size)]
+        await asyncio.gather(*(self._send_with_retry(job_id, batch, text) for batch in batches))
+        with self._lock:
+            self.jobs[job_id]["finished_at"] = time.time()
+
+    async def _send_with_retry(self, job_id, user_ids, text):
+        pending = list(user_ids)
+        attempt = 0
+        records = []
+        while pending:
+            await self._limiter.acquire(len(pending))
+            messages = [{"user_id": uid, "text": text} for uid in pending]
+            async with self._semaphore:
+                try:
+                    results = await self.provider.send_batch(messages)
+                except Exception as e:
+                    results = [(False, f"provider error: {e}")] * len(messages)
+
+            # 공급자가 요청보다 적은 결과를 돌려주면 빠진 건은 실패로 보고 재시도/기록
+            results = list(results)[:len(pending)]
+            results += [(False, "provider: 결과 누락")] * (len(pending) - len(results))
+
+            failed, sent, gave_up = [], 0, 0
+            now = time.time()
+            for uid, (ok, error) in zip(pending, results):
+                if ok:
+                    sent += 1
+                    records.append({"job_id": job_id, "user_id": uid, "status": "sent",
+                                    "attempts": attempt + 1, "at": now})
+                elif attempt >= self.max_retries:
+                    gave_up += 1
+                    records.append({"job_id": job_id, "user_id": uid, "status": "failed",
+                                    "attempts": attempt + 1, "error": error, "at": now})
+                else:
+                    failed.append(uid)
+            self._update(job_id, sent=sent, failed=gave_up, retries=len(failed))
+
+            pending = failed
+            if pending:
+                # 지수 백오프 + 지터
+                await asyncio.sleep(self.backoff_base * (2 ** attempt) * (0.5 + random.random() / 2))
+                attempt += 1
+
+        self._write_log(records)
+
+    def _write_log(self, records):
+        if not self.log_path or not records:
+            return
+        os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+        with self._lock:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+_dispatcher = None
+_dispatcher_kwargs = {}
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher(provider=None, **kwargs):
+    """
+    프로세스 전역 발송 큐 (최초 호출 시 생성, 기본 공급자는 StubProvider)
+    - 인자 없이 호출하면 현재 큐를 그대로 반환
+    - provider(다른 객체) 또는 설정(kwargs)이 현재 큐와 다르면 새 큐로 교체
+      (이전 큐는 진행 중인 작업만 마저 처리)
+    """
+    global _dispatcher, _dispatcher_kwargs
+    with _dispatcher_lock:
+        if _dispatcher is not None:
+            if provider is None and not kwargs:
+                return _dispatcher
+            provider = provider or _dispatcher.provider
+            if provider is _dispatcher.provider and kwargs == _dispatcher_kwargs:
+                return _dispatcher
+        _dispatcher = DispatchQueue(provider=provider, **kwargs)
+        _dispatcher_kwargs = dict(kwargs)
+        return _dispatcher
@@ -1,56 +1,161 @@
+import os
+import sys
+import time
+import resource
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, StratifiedKFold, cross_val_score
+from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.svm import SVC
+from sklearn.svm import SVC, LinearSVC
+from sklearn.kernel_approximation import Nystroem
+from sklearn.preprocessing import StandardScaler
+from sklearn.pipeline import make_pipeline
 from xgboost import XGBClassifier
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+
+from components.model_evaluator import compute_metrics, evaluate_cv
+from utils.data_processor import build_user_table, user_feature_columns
+
+# ✅ 이 학습 샘플 수를 넘으면 정확한 커널 SVM 대신 Nystroem 근사 커널 + 선형 SVM 사용
+SVM_EXACT_MAX_SAMPLES = 10_000
+# ✅ 학습 샘플이 이보다 적으면 n_jobs 자동 설정 시 순차 실행 (spawn 프로세스 시작 비용이 학습 시간보다 큼)
+PARALLEL_MIN_SAMPLES = 20_000
 
 # ✅ 1. 데이터 준비 함수 (X, y만 반환)
-def prepare_data(df):
-    base_cols = ["steps", "calories", "very_active_minutes", "moderately_active_minutes", "distance"]
-    df = df.dropna(subset=base_cols + ["id"])
-    df_user = df.groupby("id")[base_cols].mean().reset_index()
-
-    score = (
-        (df_user["steps"] < 6400).astype(int) +
-        (df_user["calories"] < 1800).astype(int) +
-        (df_user["very_active_minutes"] < 6).astype(int) * 2 +
-        (df_user["moderately_active_minutes"] < 8).astype(int) +
-        (df_user["distance"] < 4600).astype(int)
-    )
-
-    df_user["CHURNED"] = (score >= 4).astype(int)
-    X = df_user[base_cols]
+def prepare_data(df, temporal=False):
+    df_user = build_user_table(df, temporal=temporal)
+    X = df_user[user_feature_columns(df_user)]
     y = df_user["CHURNED"]
     return X, y
 
 # ✅ 2. train_test_split 수행하는 함수 (X_train, X_test, y_train, y_test 반환)
-def split_data(df):
-    X, y = prepare_data(df)
+def split_data(df, temporal=False):
+    X, y = prepare_data(df, temporal=temporal)
     return train_test_split(X, y, stratify=y, test_size=0.3, random_state=42)
 
 # ✅ 3. 4개 모델 비교
-def compare_models(X_train, X_test, y_train, y_test):
+def _build_models(n_samples, svm_max_samples=SVM_EXACT_MAX_SAMPLES):
+    # 비교 지표는 predict만 사용하므로 SVC의 probability=True(내부 Platt CV)는 생략
     models = {
-        "Logistic Regression": LogisticRegression(max_iter=1000),
-        "Random Forest": RandomForestClassifier(random_state=42),
-        "XGBoost": XGBClassifier(use_label_encoder=False, eval_metric="logloss", random_state=42),
-        "SVM": SVC(probability=True, random_state=42)
+        "Logistic Regression": (LogisticRegression(max_iter=1000), "exact"),
+        "Random Forest": (RandomForestClassifier(random_state=42), "exact"),
+        "XGBoost": (XGBClassifier(use_label_encoder=False, eval_metric="logloss", random_state=42), "exact"),
+        "SVM": (SVC(random_state=42), "exact")
     }
+    if n_samples > svm_max_samples:
+        n_components = min(500, svm_max_samples // 10)
+        models["SVM"] = (
+            make_pipeline(
+                StandardScaler(),
+                Nystroem(kernel="rbf", n_components=n_components, random_state=42),
+                LinearSVC(random_state=42)
+            ),
+            f"Nystroem 근사 커널({n_components}) + LinearSVC (샘플 {n_samples:,} > {svm_max_samples:,})"
+        )
+    return models
+
+def _max_rss_mb():
+    # 프로세스 최대 RSS (리눅스는 KB, macOS는 byte 단위)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def _current_rss_mb():
+    # 현재 RSS (/proc이 없는 환경이면 None → ru_maxrss 차이만 사용)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _PeakRSS:
+    """
+    구간 동안 늘어난 최대 RSS(MB): libsvm 커널 캐시, XGBoost 네이티브 버퍼 등 Python 할당자 밖의 메모리 포함
+    - ru_maxrss 차이: 작업마다 새 프로세스(spawn, max_tasks_per_child=1)에서는 정확
+    - 같은 프로세스에서 순차 실행할 때는 이전 최대치에 가려지므로 현재 RSS를 주기적으로 샘플링해 보완
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.mb = 0.0
+
+    def __enter__(self):
+        self._start_max = _max_rss_mb()
+        self._start = _current_rss_mb()
+        self._sampled = self._start
+        self._stop = threading.Event()
+        if self._start is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._sampled = max(self._sampled, _current_rss_mb() or 0.0)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._start is not None:
+            self._thread.join()
+            self._sampled = max(self._sampled, _current_rss_mb() or 0.0)
+        sampled = self._sampled - self._start if self._start is not None else 0.0
+        self.mb = max(_max_rss_mb() - self._start_max, sampled, 0.0)
+        return False
+
 
-    results = []
-    for name, model in models.items():
+def _fit_and_score(name, model, variant, X_train, X_test, y_train, y_test):
+    # 모델 1개 학습/예측 + 소요 시간과 최대 RSS 증가량 측정
+    with _PeakRSS() as peak:
+        start = time.perf_counter()
         model.fit(X_train, y_train)
+        fit_sec = time.perf_counter() - start
+
+        start = time.perf_counter()
         y_pred = model.predict(X_test)
-        results.append({
-            "Model": name,
-            "Accuracy": round(accuracy_score(y_test, y_pred), 4),
-            "Precision": round(precision_score(y_test, y_pred, zero_division=0), 4),
-            "Recall": round(recall_score(y_test, y_pred, zero_division=0), 4),
-            "F1-score": round(f1_score(y_test, y_pred, zero_division=0), 4)
-        })
+        predict_sec = time.perf_counter() - start
+
+    scores = compute_metrics(y_test, y_pred)
+    return {
+        "Model": name,
+        "Accuracy": round(scores["accuracy"], 4),
+        "Precision": round(scores["precision"], 4),
+        "Recall": round(scores["recall"], 4),
+        "F1-score": round(scores["f1_score"], 4),
+        "Fit (s)": round(fit_sec, 3),
+        "Predict (s)": round(predict_sec, 3),
+        "Peak Mem (MB)": round(peak.mb, 2),
+        "Variant": variant
+    }
+
+def compare_models(X_train, X_test, y_train, y_test, n_jobs=None, svm_max_samples=SVM_EXACT_MAX_SAMPLES):
+    """
+    - n_jobs > 1 이면 모델별로 별도 프로세스에서 동시에 학습 (작업마다 새 프로세스, 메모리 측정도 모델별로 분리됨)
+    - n_jobs=None 이면 CPU 수 기준, 단 학습 샘플이 PARALLEL_MIN_SAMPLES 미만이면 순차 실행
+    - 학습 샘플이 svm_max_samples를 넘으면 SVM을 근사 커널 버전으로 자동 전환하고 Variant 컬럼에 기록
+    """
+    models = _build_models(len(X_train), svm_max_samples)
+    if n_jobs is None:
+        n_jobs = min(len(models), os.cpu_count() or 1) if len(X_train) >= PARALLEL_MIN_SAMPLES else 1
+
+    if n_jobs <= 1:
+        results = [
+            _fit_and_score(name, model, variant, X_train, X_test, y_train, y_test)
+            for name, (model, variant) in models.items()
+        ]
+    else:
+        # Streamlit 스레드 안에서도 안전하도록 spawn 컨텍스트 사용
+        context = multiprocessing.get_context("spawn")
+        # 작업마다 새 프로세스 → 모델별 ru_maxrss 최대 메모리가 이전 모델의 최대치에 가려지지 않음
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context, max_tasks_per_child=1) as pool:
+            futures = [
+                pool.submit(_fit_and_score, name, model, variant, X_train, X_test, y_train, y_test)
+                for name, (model, variant) in models.items()
+            ]
+            results = [f.result() for f in futures]
 
     return pd.DataFrame(results)
 
@@ -61,26 +166,17 @@ def evaluate_basic_model(X, y):
     model.fit(X_train, y_train)
     y_pred = model.predict(X_test)
 
-    return {
-        "accuracy": round(accuracy_score(y_test, y_pred), 4),
-        "precision": round(precision_score(y_test, y_pred), 4),
-        "recall": round(recall_score(y_test, y_pred), 4),
-        "f1_score": round(f1_score(y_test, y_pred), 4)
-    }
+    scores = compute_metrics(y_test, y_pred)
+    return {name: round(value, 4) for name, value in scores.items()}
 
 def evaluate_cv_model(X, y, cv=5):
+    # fold당 1회만 학습하고 4개 지표를 같은 예측값에서 계산 (기존: 지표마다 cross_val_score 재실행)
     model = XGBClassifier(use_label_encoder=False, eval_metric="logloss", random_state=42)
-    skf = StratifiedKFold(n_splits=cv, shuffle=True, random_state=42)
-
-    return {
-        "accuracy": round(cross_val_score(model, X, y, scoring='accuracy', cv=skf).mean(), 4),
-        "precision": round(cross_val_score(model, X, y, scoring='precision', cv=skf).mean(), 4),
-        "recall": round(cross_val_score(model, X, y, scoring='recall', cv=skf).mean(), 4),
-        "f1_score": round(cross_val_score(model, X, y, scoring='f1', cv=skf).mean(), 4)
-    }
+    result = evaluate_cv(model, X, y, cv=cv, random_state=42)
+    return {name: round(value, 4) for name, value in result["mean"].items()}
 
-def compare_xgb_variants(df):
-    X, y = prepare_data(df)
+def compare_xgb_variants(df, temporal=False):
+    X, y = prepare_data(df, temporal=temporal)
     basic = evaluate_basic_model(X, y)
     cv = evaluate_cv_model(X, y)
     return {
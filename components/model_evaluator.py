@@ -1,23 +1,88 @@
+import numpy as np
 import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
 from sklearn.metrics import (
     classification_report,
     accuracy_score,
     precision_score,
     recall_score,
     f1_score,
-    confusion_matrix
+    confusion_matrix,
+    precision_recall_curve
 )
-import seaborn as sns
-import matplotlib.pyplot as plt
+
+# ✅ 지원 지표 (이름 → 계산 함수)
+METRIC_FUNCS = {
+    "accuracy": lambda y, p: accuracy_score(y, p),
+    "precision": lambda y, p: precision_score(y, p, zero_division=0),
+    "recall": lambda y, p: recall_score(y, p, zero_division=0),
+    "f1_score": lambda y, p: f1_score(y, p, zero_division=0),
+}
+DEFAULT_METRICS = ("accuracy", "precision", "recall", "f1_score")
+
+# ✅ 예측값 한 번으로 요청한 지표를 모두 계산
+def compute_metrics(y_true, y_pred, y_proba=None, metrics=DEFAULT_METRICS, confusion=False, pr_curve=False):
+    result = {name: METRIC_FUNCS[name](y_true, y_pred) for name in metrics}
+    if confusion:
+        result["confusion_matrix"] = confusion_matrix(y_true, y_pred)
+    if pr_curve and y_proba is not None:
+        precisions, recalls, thresholds = precision_recall_curve(y_true, y_proba)
+        result["pr_curve"] = {"precision": precisions, "recall": recalls, "thresholds": thresholds}
+    return result
+
+# ✅ fold마다 딱 한 번 학습하고 예측값/확률을 보관
+def cross_val_predictions(model, X, y, cv=5, random_state=42):
+    skf = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    X = pd.DataFrame(X)
+    y = pd.Series(np.asarray(y))
+    folds = []
+    for train_idx, val_idx in skf.split(X, y):
+        fold_model = clone(model)
+        fold_model.fit(X.iloc[train_idx], y.iloc[train_idx])
+        y_proba = fold_model.predict_proba(X.iloc[val_idx])[:, 1] if hasattr(fold_model, "predict_proba") else None
+        folds.append({
+            "val_idx": val_idx,
+            "y_true": y.iloc[val_idx].to_numpy(),
+            "y_pred": np.asarray(fold_model.predict(X.iloc[val_idx])),
+            "y_proba": y_proba
+        })
+    return folds
+
+# ✅ 교차검증 평가: fold 예측을 재사용해 지표/혼동행렬/PR 곡선 계산
+def evaluate_cv(model, X, y, cv=5, random_state=42, metrics=DEFAULT_METRICS, confusion=False, pr_curve=False):
+    folds = cross_val_predictions(model, X, y, cv=cv, random_state=random_state)
+
+    # 지표 평균은 cross_val_score(...).mean()과 같은 fold별 평균
+    fold_metrics = [compute_metrics(f["y_true"], f["y_pred"], metrics=metrics) for f in folds]
+    mean = {name: float(np.mean([m[name] for m in fold_metrics])) for name in metrics}
+
+    # out-of-fold 예측을 원래 순서로 모아 전체 혼동행렬/PR 곡선 계산
+    n = sum(len(f["val_idx"]) for f in folds)
+    oof_true = np.empty(n, dtype=int)
+    oof_pred = np.empty(n, dtype=int)
+    oof_proba = np.full(n, np.nan) if all(f["y_proba"] is not None for f in folds) else None
+    for f in folds:
+        oof_true[f["val_idx"]] = f["y_true"]
+        oof_pred[f["val_idx"]] = f["y_pred"]
+        if oof_proba is not None:
+            oof_proba[f["val_idx"]] = f["y_proba"]
+
+    result = {"mean": mean, "folds": fold_metrics, "oof_pred": oof_pred, "oof_proba": oof_proba}
+    result.update(compute_metrics(oof_true, oof_pred, oof_proba, metrics=(), confusion=confusion, pr_curve=pr_curve))
+    return result
 
 def evaluate_model(model, X_test, y_test):
     y_pred = model.predict(X_test)
-    
+    y_proba = model.predict_proba(X_test)[:, 1] if hasattr(model, "predict_proba") else None
+    scores = compute_metrics(y_test, y_pred, y_proba, confusion=True, pr_curve=True)
+
     return {
-        "accuracy": accuracy_score(y_test, y_pred),
-        "precision": precision_score(y_test, y_pred),
-        "recall": recall_score(y_test, y_pred),
-        "f1": f1_score(y_test, y_pred),
-        "confusion_matrix": confusion_matrix(y_test, y_pred),
+        "accuracy": scores["accuracy"],
+        "precision": scores["precision"],
+        "recall": scores["recall"],
+        "f1": scores["f1_score"],
+        "confusion_matrix": scores["confusion_matrix"],
+        "pr_curve": scores.get("pr_curve"),
         "report": classification_report(y_test, y_pred, output_dict=True)
     }
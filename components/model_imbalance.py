@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from utils.profiling import timed
+
+# ✅ model_train.prepare_data 불균형 처리 방식
+#  - smote        : 비이탈자 다운샘플링 → SMOTE/RandomOverSampler (기존 방식)
+#  - weight       : 전체 데이터 유지, 합성 샘플 없이 scale_pos_weight(음성/양성 비율)로 가중
+#  - blocked_smote: 전체 데이터 유지, 블록 단위 근사 이웃 탐색 SMOTE로 소수 클래스 보강
+IMBALANCE_STRATEGIES = ("smote", "weight", "blocked_smote")
+BLOCK_SIZE = 2048
+
+
+def positive_class_weight(y):
+    """
+    XGBoost scale_pos_weight 값 (음성 수 / 양성 수)
+    """
+    y = np.asarray(y)
+    pos = int((y == 1).sum())
+    return float((len(y) - pos) / pos) if pos else 1.0
+
+
+def imbalance_model_params(strategy, y_train):
+    """
+    불균형 처리 방식에 맞춰 XGBClassifier에 추가로 넘길 파라미터
+    """
+    if strategy not in IMBALANCE_STRATEGIES:
+        raise ValueError(f"지원하지 않는 strategy: {strategy} (가능: {IMBALANCE_STRATEGIES})")
+    if strategy == "weight":
+        return {"scale_pos_weight": positive_class_weight(y_train)}
+    return {}
+
+
+def _block_neighbors(X, k, block_size, rng):
+    # 주성분 방향으로 정렬 후 인접한 block_size개씩 묶어 블록 안에서만 정확한 k-최근접 이웃 계산
+    # (전체 쌍 거리 O(n²) 대신 O(n × block_size), 메모리도 블록 크기 제곱만큼만 사용)
+    n = len(X)
+    centered = X - X.mean(axis=0)
+    if n > 1 and centered.any():
+        _, _, vt = np.linalg.svd(centered[rng.choice(n, min(n, 10_000), replace=False)], full_matrices=False)
+        order = np.argsort(centered @ vt[0], kind="stable")
+    else:
+        order = np.arange(n)
+
+    neighbors = np.empty((n, k), dtype=np.int64)
+    for idx in np.array_split(order, max(1, n // block_size)):
+        block = X[idx]
+        sq = (block ** 2).sum(axis=1)
+        dist = sq[:, None] + sq[None, :] - 2 * block @ block.T
+        np.fill_diagonal(dist, np.inf)
+        nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        neighbors[idx] = idx[nearest]
+    return neighbors
+
+
+@timed("imbalance.blocked_smote")
+def blocked_smote(X, y, k_neighbors=5, block_size=BLOCK_SIZE, random_state=42):
+    """
+    근사 이웃 탐색 SMOTE: 소수 클래스가 다수 클래스 수와 같아지도록 합성 샘플 생성
+    - 이웃은 같은 블록(주성분 방향으로 가까운 block_size개) 안에서만 찾음
+    - 합성 샘플 = 기준 샘플 + U(0,1) × (이웃 - 기준 샘플), imblearn SMOTE와 같은 보간 방식
+    반환: (X_res, y_res) — 입력이 DataFrame/Series면 같은 형식 (원본 행 뒤에 합성 행)
+    """
+    columns = X.columns if isinstance(X, pd.DataFrame) else None
+    values = np.asarray(X, dtype=np.float64)
+    labels = np.asarray(y)
+
+    classes, counts = np.unique(labels, return_counts=True)
+    minority = classes[np.argmin(counts)]
+    need = int(counts.max() - counts.min())
+    minority_X = values[labels == minority]
+
+    rng = np.random.default_rng(random_state)
+    if need == 0 or len(minority_X) == 0:
+        synthetic = np.empty((0, values.shape[1]))
+    elif len(minority_X) < 2:
+        synthetic = np.repeat(minority_X, need, axis=0)
+    else:
+        k = min(k_neighbors, len(minority_X) - 1, block_size - 1)
+        neighbors = _block_neighbors(minority_X, k, block_size, rng)
+        base = rng.integers(0, len(minority_X), need)
+        other = neighbors[base, rng.integers(0, k, need)]
+        gap = rng.random((need, 1))
+        synthetic = minority_X[base] + gap * (minority_X[other] - minority_X[base])
+
+    X_res = np.vstack([values, synthetic])
+    y_res = np.concatenate([labels, np.full(len(synthetic), minority, dtype=labels.dtype)])
+    if columns is not None:
+        X_res = pd.DataFrame(X_res, columns=columns)
+    if isinstance(y, pd.Series):
+        y_res = pd.Series(y_res, name=y.name)
+    return X_res, y_res
@@ -1,11 +1,52 @@
+import threading
 import pandas as pd
 
-def predict(model):
+from components.model_registry import load_model, get_model_meta
+from utils.cache import file_fingerprint
+
+# ✅ 테스트 데이터도 파일 지문이 같으면 다시 읽지 않음
+_frame_cache = {}
+_frame_lock = threading.Lock()
+
+def load_test_data(path='data/processed/X_test.csv'):
+    fingerprint = file_fingerprint(path)
+    with _frame_lock:
+        cached = _frame_cache.get(path)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+    df = pd.read_csv(path)
+    with _frame_lock:
+        _frame_cache[path] = (fingerprint, df)
+    return df
+
+def score_frame(model, X, features=None, id_col="id"):
+    # 학습 때의 피처 순서로 맞춘 뒤 이탈 확률(양성 클래스) 반환
+    # 피처 메타데이터가 없는 모델이면 id 컬럼만 빼고 나머지를 피처로 사용
+    if features:
+        X = X[features]
+    elif id_col is not None and id_col in X.columns:
+        X = X.drop(columns=[id_col])
+    return model.predict_proba(X)[:, 1]
+
+def predict(model=None, X_test=None, path='data/processed/X_test.csv', name="churn_model", version=None):
     print("자 모델 예측 드가자~~~")
+    # 모델을 넘기지 않으면 레지스트리 현재 버전 사용 (프로세스 캐시에서 재사용)
+    threshold = None
+    features = None
+    if model is None:
+        model = load_model(name, version)
+        meta = get_model_meta(name, version)
+        threshold = meta.get("threshold")
+        features = meta.get("features")
+
     # 테스트 데이터 로드
-    X_test = pd.read_csv('data/processed/X_test.csv')
+    if X_test is None:
+        X_test = load_test_data(path)
 
-    # 예측 수행
-    predictions = model.predict(X_test)
+    # 예측 수행 (저장된 threshold가 있으면 그 기준으로 분류)
+    if threshold is not None:
+        predictions = (score_frame(model, X_test, features) >= threshold).astype(int)
+    else:
+        predictions = model.predict(X_test[features] if features else X_test)
     print("예측 끝")
     return predictions
@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+import xgboost
+from xgboost import XGBClassifier
+
+# ✅ 버전별 모델 저장 위치: models/registry/<name>/v0001/{model.ubj, meta.json}
+REGISTRY_DIR = "models/registry"
+MODEL_FILE = "model.ubj"
+META_FILE = "meta.json"
+CURRENT_FILE = "CURRENT"
+
+# ✅ 프로세스 전역 LRU 캐시 (역직렬화된 모델을 재사용)
+MAX_CACHED_MODELS = 4
+_model_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _model_dir(name, registry_dir=REGISTRY_DIR):
+    return os.path.join(registry_dir, name)
+
+
+def list_versions(name="churn_model", registry_dir=REGISTRY_DIR):
+    """
+    등록된 버전 목록 (오래된 순)
+    """
+    model_dir = _model_dir(name, registry_dir)
+    if not os.path.isdir(model_dir):
+        return []
+    return sorted(v for v in os.listdir(model_dir)
+                  if v.startswith("v") and os.path.exists(os.path.join(model_dir, v, MODEL_FILE)))
+
+
+def current_version(name="churn_model", registry_dir=REGISTRY_DIR):
+    """
+    현재 서비스 중인 버전 (CURRENT 포인터, 없으면 최신 버전)
+    """
+    pointer = os.path.join(_model_dir(name, registry_dir), CURRENT_FILE)
+    if os.path.exists(pointer):
+        with open(pointer, encoding="utf-8") as f:
+            version = f.read().strip()
+        if version:
+            return version
+    versions = list_versions(name, registry_dir)
+    if not versions:
+        raise FileNotFoundError(f"❌ 등록된 모델이 없습니다: {name}")
+    return versions[-1]
+
+
+def set_current_version(name, version, registry_dir=REGISTRY_DIR):
+    """
+    CURRENT 포인터만 교체 → 재학습/재저장 없이 즉시 버전 전환
+    """
+    if version not in list_versions(name, registry_dir):
+        raise ValueError(f"❌ 존재하지 않는 버전입니다: {name} {version}")
+    pointer = os.path.join(_model_dir(name, registry_dir), CURRENT_FILE)
+    tmp = pointer + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp, pointer)
+    return version
+
+
+def rollback(name="churn_model", version=None, registry_dir=REGISTRY_DIR):
+    """
+    지정 버전(없으면 현재 바로 이전 버전)으로 롤백
+    """
+    if version is None:
+        versions = list_versions(name, registry_dir)
+        current = current_version(name, registry_dir)
+        older = [v for v in versions if v < current]
+        if not older:
+            raise ValueError(f"❌ 롤백할 이전 버전이 없습니다: {name} {current}")
+        version = older[-1]
+    return set_current_version(name, version, registry_dir)
+
+
+def register_model(model, name="churn_model", features=None, threshold=None,
+                   data_fingerprint=None, metrics=None, activate=True, registry_dir=REGISTRY_DIR):
+    """
+    XGBoost 모델을 네이티브 바이너리(UBJSON)로 새 버전 저장 + 메타데이터 기록
+    - features: 학습에 사용한 피처 순서
+    - threshold: find_best_threshold_by_precision으로 찾은 분류 기준값
+    - data_fingerprint: 학습 데이터 지문 (utils.cache.frame_fingerprint 등)
+    반환: 새 버전 문자열 (예: "v0003")
+    """
+    model_dir = _model_dir(name, registry_dir)
+    os.makedirs(model_dir, exist_ok=True)
+
+    versions = list_versions(name, registry_dir)
+    version = f"v{int(versions[-1][1:]) + 1 if versions else 1:04d}"
+    version_dir = os.path.join(model_dir, version)
+    os.makedirs(version_dir)
+
+    if features is None and getattr(model, "feature_names_in_", None) is not None:
+        features = list(model.feature_names_in_)
+
+    meta = {
+        "name": name,
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "features": features,
+        "threshold": None if threshold is None else float(threshold),
+        "data_fingerprint": data_fingerprint,
+        "metrics": metrics,
+        "xgboost": xgboost.__version__,
+    }
+    model.save_model(os.path.join(version_dir, MODEL_FILE))
+    with open(os.path.join(version_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2, default=str)
+
+    if activate:
+        set_current_version(name, version, registry_dir)
+    return version
+
+
+def get_model_meta(name="churn_model", version=None, registry_dir=REGISTRY_DIR):
+    """
+    버전 메타데이터 로드 (version=None 이면 현재 버전)
+    """
+    version = version or current_version(name, registry_dir)
+    with open(os.path.join(_model_dir(name, registry_dir), version, META_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_model(name="churn_model", version=None, registry_dir=REGISTRY_DIR):
+    """
+    등록된 모델 로드 (version=None 이면 현재 버전)
+    한 번 로드한 (이름, 버전)은 LRU 캐시에서 바로 반환 → 역직렬화 비용은 최초 1회만
+    """
+    version = version or current_version(name, registry_dir)
+    key = (os.path.abspath(registry_dir), name, version)
+
+    with _cache_lock:
+        if key in _model_cache:
+            _model_cache.move_to_end(key)
+            return _model_cache[key]
+
+    path = os.path.join(_model_dir(name, registry_dir), version, MODEL_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"❌ 모델 파일이 없습니다: {path}")
+    model = XGBClassifier()
+    model.load_model(path)
+
+    with _cache_lock:
+        _model_cache[key] = model
+        _model_cache.move_to_end(key)
+        while len(_model_cache) > MAX_CACHED_MODELS:
+            _model_cache.popitem(last=False)
+    return model
+
+
+def clear_model_cache():
+    """
+    프로세스 내 모델 캐시 비우기
+    """
+    with _cache_lock:
+        _model_cache.clear()
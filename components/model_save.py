@@ -1,9 +1,15 @@
-import joblib
-import os
+from components.model_registry import register_model
 
-def save_model(model, filename='models/churn_model.pkl'):
+def save_model(model, name="churn_model", features=None, threshold=None, data_fingerprint=None, metrics=None):
     print("자 모델 저장 드가자~~~")
-    # 모델 저장 디렉토리 생성
-    os.makedirs('models', exist_ok=True)
-    joblib.dump(model, filename)
-    print(f"모델 저장 완료스 → {filename}")
+    # 덮어쓰지 않고 레지스트리에 새 버전으로 저장 (XGBoost 네이티브 포맷 + 메타데이터)
+    version = register_model(
+        model,
+        name=name,
+        features=features,
+        threshold=threshold,
+        data_fingerprint=data_fingerprint,
+        metrics=metrics
+    )
+    print(f"모델 저장 완료스 → {name} {version}")
+    return version
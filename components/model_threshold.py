@@ -0,0 +1,140 @@
+import numpy as np
+
+# ✅ 지원 목적 함수
+#  - precision_floor: precision ≥ min_precision 중 recall 최대 (기존 find_best_threshold_by_precision 기준)
+#  - fbeta          : F-beta 최대
+#  - cost           : 개입 비용(이탈/비이탈 모두) + 놓친 이탈자 비용의 합 최소
+OBJECTIVES = ("precision_floor", "fbeta", "cost")
+
+
+def _sorted_inputs(y_true, y_proba):
+    # 확률 내림차순 정렬 + 고유 확률값마다 마지막 위치 (= threshold 후보)
+    y_true = np.asarray(y_true).astype(np.float64)
+    y_proba = np.asarray(y_proba, dtype=np.float64)
+    order = np.argsort(-y_proba, kind="mergesort")
+    proba = y_proba[order]
+    labels = y_true[order]
+    last = np.r_[np.flatnonzero(np.diff(proba)), len(proba) - 1]
+    return labels, proba[last], last
+
+
+def _curve_from_counts(tps, fps, pos, neg, thresholds):
+    # TP/FP 누적값 → 모든 threshold의 혼동행렬 + precision/recall (1차원/2차원 모두 지원)
+    predicted = tps + fps
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tps / predicted, 1.0)
+        recall = np.where(pos > 0, tps / pos, 0.0)
+    return {
+        "thresholds": thresholds,
+        "tp": tps, "fp": fps, "fn": pos - tps, "tn": neg - fps,
+        "precision": precision, "recall": recall,
+    }
+
+
+def threshold_curve(y_true, y_proba):
+    """
+    모든 후보 threshold(고유 확률값, 내림차순)에 대한 TP/FP/FN/TN, precision, recall을 한 번에 계산
+    정렬 1회 + 누적합만 사용 (파이썬 루프 없음)
+    """
+    labels, thresholds, last = _sorted_inputs(y_true, y_proba)
+    tps = np.cumsum(labels)[last]
+    fps = (last + 1) - tps
+    pos = labels.sum()
+    return _curve_from_counts(tps, fps, pos, len(labels) - pos, thresholds)
+
+
+def _objective_scores(curve, objective, min_precision, beta, cost_intervention, cost_missed):
+    # threshold별 점수 (클수록 좋음), 마지막 축이 threshold 축
+    precision, recall = curve["precision"], curve["recall"]
+    if objective == "precision_floor":
+        return np.where(precision >= min_precision, recall, -np.inf)
+    if objective == "fbeta":
+        b2 = beta ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            f = (1 + b2) * precision * recall / (b2 * precision + recall)
+        return np.nan_to_num(f, nan=0.0)
+    if objective == "cost":
+        cost = cost_intervention * (curve["tp"] + curve["fp"]) + cost_missed * curve["fn"]
+        return -cost
+    raise ValueError(f"지원하지 않는 objective: {objective} (가능: {OBJECTIVES})")
+
+
+def _select(curve, objective, min_precision, beta, cost_intervention, cost_missed):
+    # 최적 threshold 위치 (동점이면 더 높은 threshold = 개입 대상이 적은 쪽)
+    scores = _objective_scores(curve, objective, min_precision, beta, cost_intervention, cost_missed)
+    best = np.argmax(scores, axis=-1)
+    if objective == "precision_floor":
+        # precision 기준을 만족하는 후보가 없으면 precision × recall 최대 지점
+        feasible = np.isfinite(np.take_along_axis(scores, np.expand_dims(best, -1), -1)).squeeze(-1)
+        fallback = np.argmax(curve["precision"] * curve["recall"], axis=-1)
+        best = np.where(feasible, best, fallback)
+    return best
+
+
+def _pick(values, idx):
+    return np.take_along_axis(values, np.expand_dims(idx, -1), -1).squeeze(-1)
+
+
+def optimize_threshold(y_true, y_proba, objective="precision_floor", min_precision=0.75,
+                       beta=1.0, cost_intervention=1.0, cost_missed=5.0):
+    """
+    목적 함수 기준 최적 threshold와 그 지점의 지표 반환
+    """
+    curve = threshold_curve(y_true, y_proba)
+    i = int(_select(curve, objective, min_precision, beta, cost_intervention, cost_missed))
+    precision, recall = curve["precision"][i], curve["recall"][i]
+    b2 = beta ** 2
+    denom = b2 * precision + recall
+    return {
+        "objective": objective,
+        "threshold": float(curve["thresholds"][i]),
+        "precision": float(precision),
+        "recall": float(recall),
+        "fbeta": float((1 + b2) * precision * recall / denom) if denom > 0 else 0.0,
+        "cost": float(cost_intervention * (curve["tp"][i] + curve["fp"][i]) + cost_missed * curve["fn"][i]),
+        "tp": int(curve["tp"][i]), "fp": int(curve["fp"][i]),
+        "fn": int(curve["fn"][i]), "tn": int(curve["tn"][i]),
+    }
+
+
+def bootstrap_threshold_ci(y_true, y_proba, objective="precision_floor", n_boot=200, alpha=0.05,
+                           batch_size=None, random_state=42, min_precision=0.75, beta=1.0,
+                           cost_intervention=1.0, cost_missed=5.0):
+    """
+    부트스트랩으로 최적 threshold / precision / recall의 신뢰구간 계산
+    - 정렬은 한 번만 하고, 재표본은 Poisson(1) 가중치 행렬(배치 × 샘플)로 표현
+    - 배치 단위 누적합으로 모든 재표본의 threshold 곡선을 동시에 계산 (행 복사 없음)
+    반환: 지표별 {"estimate", "low", "high"} dict
+    """
+    labels, thresholds, last = _sorted_inputs(y_true, y_proba)
+    n = len(labels)
+    rng = np.random.default_rng(random_state)
+    if batch_size is None:
+        # 배치당 가중치 행렬을 약 400만 원소(float32 16MB) 이내로 유지
+        batch_size = max(1, min(n_boot, 4_000_000 // max(n, 1)))
+
+    chosen = {"threshold": [], "precision": [], "recall": []}
+    done = 0
+    while done < n_boot:
+        b = min(batch_size, n_boot - done)
+        weights = rng.poisson(1.0, size=(b, n)).astype(np.float32)
+        tps = np.cumsum(weights * labels, axis=1, dtype=np.float64)[:, last]
+        total = np.cumsum(weights, axis=1, dtype=np.float64)[:, last]
+        fps = total - tps
+        pos = tps[:, -1:]
+        neg = fps[:, -1:]
+        curve = _curve_from_counts(tps, fps, pos, neg, thresholds)
+        idx = _select(curve, objective, min_precision, beta, cost_intervention, cost_missed)
+        chosen["threshold"].append(thresholds[idx])
+        chosen["precision"].append(_pick(curve["precision"], idx))
+        chosen["recall"].append(_pick(curve["recall"], idx))
+        done += b
+
+    point = optimize_threshold(y_true, y_proba, objective, min_precision, beta, cost_intervention, cost_missed)
+    result = {}
+    for name, values in chosen.items():
+        values = np.concatenate(values)
+        low, high = np.quantile(values, [alpha / 2, 1 - alpha / 2])
+        result[name] = {"estimate": point[name], "low": float(low), "high": float(high)}
+    result["n_boot"] = n_boot
+    return result
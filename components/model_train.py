@@ -1,37 +1,56 @@
+import os
+import json
+import time
+import itertools
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score,
-    classification_report, confusion_matrix, precision_recall_curve
-)
+from sklearn.metrics import precision_score
 from imblearn.over_sampling import SMOTE, RandomOverSampler
 from xgboost import XGBClassifier
 import matplotlib.pyplot as plt
 import seaborn as sns
 import streamlit as st
 
+from components.model_evaluator import compute_metrics
+from components.model_imbalance import IMBALANCE_STRATEGIES, blocked_smote, imbalance_model_params
+from components.model_threshold import optimize_threshold
+from utils.cache import CACHE_DIR, atomic_write, frame_fingerprint, params_fingerprint
+from utils.data_processor import build_user_table
+from utils.profiling import timed
+
+# ✅ Precision 기준 튜닝 그리드 (n_estimators는 successive halving의 자원으로 사용)
+PARAM_GRID = {
+    "max_depth": [3, 4],
+    "learning_rate": [0.01, 0.05],
+    "n_estimators": [100, 200]
+}
+TRIAL_CACHE_PATH = os.path.join(CACHE_DIR, "xgb_trials.json")
+
 # 1. 사용자 기반 데이터 준비 함수
-def prepare_data(df):
-    import numpy as np
-    from sklearn.model_selection import train_test_split
-    from imblearn.over_sampling import SMOTE, RandomOverSampler
-
-    base_cols = ["steps", "calories", "very_active_minutes", "moderately_active_minutes", "distance"]
-    df = df.dropna(subset=base_cols + ["id"])
-
-    df_user = df.groupby("id")[base_cols].mean().reset_index()
-
-    # 🎯 안전한 점수 계산 방식 (Series 기반)
-    score = (
-        (df_user["steps"] < 6400).astype(int) +
-        (df_user["calories"] < 1800).astype(int) +
-        (df_user["very_active_minutes"] < 6).astype(int) * 2 +
-        (df_user["moderately_active_minutes"] < 8).astype(int) +
-        (df_user["distance"] < 4600).astype(int)
-    )
+def prepare_data(df, strategy="smote", temporal=False):
+    """
+    strategy (components.model_imbalance.IMBALANCE_STRATEGIES)
+    - "smote"        : 비이탈자를 이탈자 수만큼 다운샘플링 후 SMOTE (기존 방식)
+    - "weight"       : 전체 사용자 사용, 합성 샘플 없음 (학습 시 imbalance_model_params로 가중치 전달)
+    - "blocked_smote": 전체 사용자 사용, 학습 데이터만 블록 근사 이웃 SMOTE로 균형화
+    temporal=True: 평균 활동량에 시계열 피처(utils.temporal_features)를 더해 학습
+    반환: X_train, X_test, y_train, y_test
+    """
+    if strategy not in IMBALANCE_STRATEGIES:
+        raise ValueError(f"지원하지 않는 strategy: {strategy} (가능: {IMBALANCE_STRATEGIES})")
 
-    df_user["CHURNED"] = (score >= 4).astype(int)
+    df_user = build_user_table(df, temporal=temporal)
+
+    if strategy != "smote":
+        if df_user["CHURNED"].value_counts().reindex([0, 1], fill_value=0).min() < 2:
+            raise ValueError("CHURNED 또는 비이탈자 샘플 수가 너무 적습니다.")
+        X = df_user.drop(columns=["CHURNED", "id"])
+        y = df_user["CHURNED"].astype(int)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, stratify=y, test_size=0.3, random_state=42)
+        if strategy == "blocked_smote":
+            X_train, y_train = blocked_smote(X_train, y_train, random_state=42)
+        return X_train, X_test, y_train, y_test
 
     churned_df = df_user[df_user["CHURNED"] == 1]
     nonchurn_df_pool = df_user[df_user["CHURNED"] == 0]
@@ -61,16 +80,25 @@ def prepare_data(df):
 
 
 # 2. 모델 학습 함수 (Precision 기준 튜닝)
-def train_best_xgb_model(X_train, y_train):
-    param_grid = {
-        "max_depth": [3, 4],
-        "learning_rate": [0.01, 0.05],
-        "n_estimators": [100, 200]
-    }
+def train_best_xgb_model(X_train, y_train, search="halving", max_fits=None, time_budget=None, model_params=None):
+    """
+    search="halving": 검증 fold 1개 + successive halving 예산 탐색 (기본값)
+    search="grid"   : 기존 GridSearchCV(cv=3) 전수 탐색
+    model_params: 모든 후보 모델에 공통으로 넘길 XGBoost 파라미터 (예: scale_pos_weight)
+    """
+    model_params = model_params or {}
+    if search == "halving":
+        model, summary = search_xgb_params(X_train, y_train, max_fits=max_fits, time_budget=time_budget,
+                                           model_params=model_params)
+        st.caption(
+            f"🔎 하이퍼파라미터 탐색: 학습 {summary['fits']}회 "
+            f"(전체 그리드 대비 {summary['skipped_fits']}회 생략, 이전 결과 재사용 {summary['cached_trials']}회)"
+        )
+        return model
 
     grid = GridSearchCV(
-        XGBClassifier(use_label_encoder=False, eval_metric="logloss", random_state=42),
-        param_grid=param_grid,
+        XGBClassifier(use_label_encoder=False, eval_metric="logloss", random_state=42, **model_params),
+        param_grid=PARAM_GRID,
         scoring="precision",
         cv=3,
         n_jobs=-1
@@ -78,17 +106,143 @@ def train_best_xgb_model(X_train, y_train):
     grid.fit(X_train, y_train)
     return grid.best_estimator_
 
+# 2-1. 완료된 trial 기록 (실행 간 재사용)
+def _load_trials(path):
+    if path and os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+def _save_trials(path, trials):
+    # 교체 직전에 파일의 최신 내용과 합침 → 동시에 탐색한 다른 세션의 trial도 유지
+    if not path:
+        return
+
+    def _write(tmp):
+        merged = _load_trials(path)
+        merged.update(trials)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(merged, f)
+    atomic_write(path, _write)
+
+# 2-2. 예산 기반 successive halving 탐색
+@timed("xgb.search")
+def search_xgb_params(X_train, y_train, param_grid=PARAM_GRID, max_fits=None, time_budget=None,
+                      eta=2, min_resource=25, trial_cache=TRIAL_CACHE_PATH, model_params=None):
+    """
+    - 학습 데이터에서 검증 fold 1개를 떼고, (max_depth, learning_rate) 조합을 적은 트리 수부터 평가해
+      상위 1/eta만 다음 단계(트리 수 eta배)로 승급
+    - 트리 수 그리드(100, 200 등)는 한 번의 학습에서 iteration_range로 함께 평가 → 추가 학습 없음
+    - max_fits(학습 횟수) 또는 time_budget(초)를 넘으면 그때까지의 최고 조합으로 종료
+      (그리드 트리 수까지 못 가면 도달한 최고 단계 기준으로 고르고 그리드 트리 수로 학습, summary["fallback_trees"]에 기록
+       평가된 조합이 하나도 없으면 그리드 첫 조합, best_precision=None)
+    - 완료된 trial 점수는 데이터 지문과 함께 파일에 저장되어 다음 실행에서 재학습 없이 재사용
+    반환: (전체 학습 데이터로 다시 학습한 최적 모델, 탐색 요약 dict)
+    """
+    start = time.perf_counter()
+    model_params = model_params or {}
+    tree_grid = sorted(param_grid["n_estimators"])
+    other_keys = [k for k in param_grid if k != "n_estimators"]
+    configs = [dict(zip(other_keys, values)) for values in itertools.product(*(param_grid[k] for k in other_keys))]
+
+    # ✅ 자원(트리 수) 단계: ..., max/eta², max/eta, max
+    rungs = [tree_grid[-1]]
+    while rungs[0] // eta >= min_resource and len(rungs) < len(configs).bit_length() + 1:
+        rungs.insert(0, rungs[0] // eta)
+
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, stratify=y_train, test_size=1 / 3, random_state=42
+    )
+    data_key = frame_fingerprint(pd.DataFrame(X_train), pd.Series(np.asarray(y_train), name="y"))
+    trials = _load_trials(trial_cache)
+
+    fits = 0
+    cached = 0
+    scores = {}  # (config index, 트리 수) → precision
+    budget_hit = False
+
+    def _over_budget():
+        return (max_fits is not None and fits >= max_fits) or \
+               (time_budget is not None and time.perf_counter() - start >= time_budget)
+
+    survivors = list(range(len(configs)))
+    for rung, resource in enumerate(rungs):
+        rung_scores = {}
+        for i in survivors:
+            trial_key = data_key + "_" + params_fingerprint(resource=resource, **configs[i], **model_params)
+            if trial_key in trials:
+                cached += 1
+                result = trials[trial_key]
+            else:
+                if _over_budget():
+                    budget_hit = True
+                    break
+                model = XGBClassifier(use_label_encoder=False, eval_metric="logloss", random_state=42,
+                                      n_estimators=resource, **configs[i], **model_params)
+                model.fit(X_fit, y_fit)
+                fits += 1
+                # 한 번 학습한 모델로 자원 이하 모든 트리 수 지점 평가
+                points = sorted({n for n in tree_grid if n <= resource} | {resource})
+                result = {}
+                for n in points:
+                    y_pred = (model.predict_proba(X_val, iteration_range=(0, n))[:, 1] >= 0.5).astype(int)
+                    result[str(n)] = precision_score(y_val, y_pred, zero_division=0)
+                trials[trial_key] = result
+            for n, score in result.items():
+                scores[(i, int(n))] = score
+            rung_scores[i] = max(result.values())
+        if budget_hit or rung == len(rungs) - 1 or not rung_scores:
+            break
+        keep = max(1, len(rung_scores) // eta)
+        survivors = sorted(rung_scores, key=lambda i: (-rung_scores[i], i))[:keep]
+
+    _save_trials(trial_cache, trials)
+
+    # ✅ 그리드에 있는 트리 수 지점 중 최고 점수 (동점이면 그리드 순서가 앞선 조합)
+    #    예산이 그리드 트리 수에 닿기 전에 끝나면: 도달한 가장 높은 단계의 최고 조합을 그리드 최소 트리 수로 학습
+    #    예산(max_fits=0 등)이 첫 학습 전에 끝나 점수가 없으면: 그리드 첫 조합 + 최대 트리 수로 학습
+    grid_scores = {k: v for k, v in scores.items() if k[1] in tree_grid}
+    fallback_trees = None
+    if grid_scores:
+        best_i, best_n = max(grid_scores, key=lambda k: (grid_scores[k], -k[0], -k[1]))
+        best_precision = round(float(grid_scores[(best_i, best_n)]), 4)
+    elif scores:
+        fallback_trees = max(n for _, n in scores)
+        rung_scores = {i: v for (i, n), v in scores.items() if n == fallback_trees}
+        best_i = max(rung_scores, key=lambda i: (rung_scores[i], -i))
+        best_n = min(n for n in tree_grid if n >= fallback_trees)
+        best_precision = round(float(rung_scores[best_i]), 4)
+    else:
+        best_i, best_n, best_precision = 0, tree_grid[-1], None
+    best_params = dict(configs[best_i], n_estimators=best_n)
+
+    best_model = XGBClassifier(use_label_encoder=False, eval_metric="logloss", random_state=42,
+                               **best_params, **model_params)
+    best_model.fit(X_train, y_train)
+    fits += 1
+
+    full_grid_fits = len(configs) * len(tree_grid) * 3 + 1
+    summary = {
+        "best_params": best_params,
+        "best_precision": best_precision,
+        "fallback_trees": fallback_trees,  # None이 아니면 best_precision은 이 트리 수에서의 검증 점수
+        "fits": fits,
+        "cached_trials": cached,
+        "skipped_fits": max(0, full_grid_fits - fits),
+        "budget_exhausted": budget_hit,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    return best_model, summary
+
 # 3. 최적 threshold (Precision 우선)
-def find_best_threshold_by_precision(model, X_test, y_test):
+def find_best_threshold_by_precision(model, X_test, y_test, min_precision=0.75):
+    # 모든 후보 threshold를 벡터 연산으로 한 번에 평가 (precision ≥ min_precision 중 recall 최대)
     y_proba = model.predict_proba(X_test)[:, 1]
-    precisions, recalls, thresholds = precision_recall_curve(y_test, y_proba)
-    candidates = [(p, r, t) for p, r, t in zip(precisions, recalls, thresholds) if p >= 0.75]
-    if candidates:
-        best = max(candidates, key=lambda x: x[1])  # recall 최대
-        return best[2], best[0], best[1]
-    else:
-        idx = (precisions * recalls).argmax()
-        return thresholds[idx], precisions[idx], recalls[idx]
+    best = optimize_threshold(y_test, y_proba, objective="precision_floor", min_precision=min_precision)
+    return best["threshold"], best["precision"], best["recall"]
 
 # 4. 평가 함수
 
@@ -96,13 +250,9 @@ def evaluate_model(model, X_test, y_test, threshold):
     y_proba = model.predict_proba(X_test)[:, 1]
     y_pred = (y_proba >= threshold).astype(int)
 
-    report = {
-        "accuracy": round(accuracy_score(y_test, y_pred), 4),
-        "precision": round(precision_score(y_test, y_pred, zero_division=0), 4),
-        "recall": round(recall_score(y_test, y_pred, zero_division=0), 4),
-        "f1_score": round(f1_score(y_test, y_pred, zero_division=0), 4),
-        "threshold": float(round(threshold, 3))
-    }
+    scores = compute_metrics(y_test, y_pred, y_proba)
+    report = {name: round(value, 4) for name, value in scores.items()}
+    report["threshold"] = float(round(threshold, 3))
 
     if report["accuracy"] == 1.0 or report["f1_score"] == 1.0:
         st.warning("⚠️ 모델 성능이 너무 완벽합니다. 데이터 누수나 기준 과단순 가능성 확인 필요!")
@@ -129,9 +279,9 @@ def plot_metrics_bar(report_summary):
 
 # 6. 통합 실행
 
-def train_xgb_model_with_smote(df):
-    X_train, X_test, y_train, y_test = prepare_data(df)
-    model = train_best_xgb_model(X_train, y_train)
+def train_xgb_model_with_smote(df, strategy="smote", temporal=False):
+    X_train, X_test, y_train, y_test = prepare_data(df, strategy=strategy, temporal=temporal)
+    model = train_best_xgb_model(X_train, y_train, model_params=imbalance_model_params(strategy, y_train))
     threshold, _, _ = find_best_threshold_by_precision(model, X_test, y_test)
     report = evaluate_model(model, X_test, y_test, threshold)
     return model, report, threshold
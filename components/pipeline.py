@@ -0,0 +1,118 @@
+import time
+import pandas as pd
+import streamlit as st
+
+from components.care_predict import prepare_data, get_cross_val_probs
+from utils.cache import frame_fingerprint, params_fingerprint
+from utils.data_processor import assign_risk
+from utils.segments import build_segment_cube
+from utils.profiling import span
+
+# ✅ 페이지 공통 파이프라인 단계 (입력 → 출력)
+#   prepare      : df                      → (df_user, X, y)
+#   demographics : prepare + df            → df_user + gender/age
+#   score        : prepare                 → out-of-fold 이탈 확률
+#   risk         : prepare + score         → df_user + churn_prob/risk
+#   enrich       : risk + df               → df_user + churn_prob/risk + gender/age
+#   segments_*   : demographics / risk / enrich → 위험군 × 연령대 × 성별 집계 큐브
+_MEMO_KEY = "_pipeline_memo"
+_LOG_KEY = "_pipeline_log"
+
+
+def _source_key(df):
+    # load_fitbit_data가 남긴 원본 파일 지문 + 컬럼 구성 (없으면 내용 해시)
+    fingerprint = df.attrs.get("source_fingerprint")
+    if fingerprint is None:
+        fingerprint = frame_fingerprint(df)
+    return params_fingerprint(source=fingerprint, columns=list(map(str, df.columns)), rows=len(df))
+
+
+def _run_stage(name, upstream, compute):
+    """
+    upstream(상위 단계 키 + 파라미터)가 지난 실행과 같으면 세션에 저장된 결과 재사용, 다르면 재계산
+    반환: (이 단계의 키, 결과)
+    """
+    memo = st.session_state.setdefault(_MEMO_KEY, {})
+    log = st.session_state.setdefault(_LOG_KEY, [])
+    key = params_fingerprint(stage=name, upstream=upstream)
+
+    start = time.perf_counter()
+    with span(f"pipeline.{name}") as record:
+        entry = memo.get(name)
+        if entry is not None and entry["key"] == key:
+            value, status = entry["value"], "hit"
+        else:
+            value, status = compute(), "recompute"
+            memo[name] = {"key": key, "value": value}
+        if record is not None:
+            record["status"] = status
+    log.append({"stage": name, "status": status, "seconds": round(time.perf_counter() - start, 4)})
+    return key, value
+
+
+def _demographics(df):
+    return df[["id", "gender", "age"]].drop_duplicates()
+
+
+def _pipeline(df, until, n_splits, random_state):
+    # 반환: (마지막 단계 키, 결과 DataFrame)
+    source = _source_key(df)
+
+    prepare_key, (df_user, X, y) = _run_stage("prepare", [source], lambda: prepare_data(df))
+
+    if until == "demographics":
+        return _run_stage(
+            "demographics", [prepare_key, source],
+            lambda: pd.merge(df_user, _demographics(df), on="id", how="left")
+        )
+
+    score_key, probs = _run_stage(
+        "score", [prepare_key, n_splits, random_state],
+        lambda: get_cross_val_probs(X, y, n_splits=n_splits, random_state=random_state)
+    )
+
+    def _with_risk():
+        scored = df_user.copy()
+        scored["churn_prob"] = probs
+        scored["risk"] = assign_risk(scored["churn_prob"])
+        return scored
+
+    risk_key, scored = _run_stage("risk", [prepare_key, score_key], _with_risk)
+    if until == "risk":
+        return risk_key, scored
+
+    return _run_stage(
+        "enrich", [risk_key, source],
+        lambda: pd.merge(scored, _demographics(df), on="id", how="left")
+    )
+
+
+def run_user_pipeline(df, until="enrich", n_splits=5, random_state=42):
+    """
+    prepare → score → risk → enrich 단계를 세션 단위로 메모이즈하며 실행
+    - until="demographics": 이탈 확률 없이 사용자 테이블 + 성별/나이만 (지표 확인 페이지용)
+    - until="risk"        : 성별/나이 병합 전 단계
+    - until="enrich"      : 이탈 확률/위험군 + 성별/나이 (기본)
+    반환되는 DataFrame은 다른 페이지와 공유되므로 수정이 필요하면 copy() 후 사용
+    """
+    st.session_state[_LOG_KEY] = []
+    return _pipeline(df, until, n_splits, random_state)[1]
+
+
+def run_segment_pipeline(df, until="enrich", n_splits=5, random_state=42):
+    """
+    run_user_pipeline + 세그먼트 큐브 단계 (utils.segments.build_segment_cube)
+    - 위험군별 인원/평균만 필요하면 until="risk" (사용자당 1행, 성별/나이 병합으로 인한 중복 없음)
+    반환: (df_user, cube) — 세그먼트별 인원/평균/조건 충족률은 segment_query(cube, ...)로 조회
+    """
+    st.session_state[_LOG_KEY] = []
+    key, df_user = _pipeline(df, until, n_splits, random_state)
+    _, cube = _run_stage(f"segments_{until}", [key], lambda: build_segment_cube(df_user))
+    return df_user, cube
+
+
+def pipeline_log():
+    """
+    마지막 run_user_pipeline 호출의 단계별 적중/재계산 여부와 소요 시간
+    """
+    return list(st.session_state.get(_LOG_KEY, []))
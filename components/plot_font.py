@@ -0,0 +1,18 @@
+import platform
+
+_configured = False
+
+# ✅ 한글 폰트 설정 (matplotlib를 실제로 쓰는 시점에 한 번만 적용)
+def use_korean_font():
+    global _configured
+    if _configured:
+        return
+    import matplotlib.pyplot as plt
+    if platform.system() == "Darwin":
+        plt.rcParams['font.family'] = 'AppleGothic'
+    elif platform.system() == "Windows":
+        plt.rcParams['font.family'] = 'Malgun Gothic'
+    else:
+        plt.rcParams['font.family'] = 'NanumGothic'
+    plt.rcParams['axes.unicode_minus'] = False
+    _configured = True
@@ -0,0 +1,230 @@
+import json
+import time
+import asyncio
+import argparse
+from collections import deque
+
+import numpy as np
+
+from components.model_registry import load_model, get_model_meta
+from utils.data_processor import BASE_COLS, RISK_BINS, RISK_LABELS
+
+
+# ✅ 확률 → 위험군 라벨 (pd.cut과 같은 구간: (a, b])
+def _risk_labels(probs):
+    idx = np.searchsorted(RISK_BINS[1:-1], probs, side="left")
+    return [RISK_LABELS[i] for i in idx]
+
+
+class LatencyStats:
+    """
+    요청 지연시간(p50/p99)과 처리량 카운터
+    """
+
+    def __init__(self, window=10_000):
+        self.latencies = deque(maxlen=window)
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.batch_rows = 0
+        self.errors = 0
+
+    def record(self, seconds, rows):
+        self.latencies.append(seconds)
+        self.requests += 1
+        self.rows += rows
+
+    def snapshot(self):
+        elapsed = time.perf_counter() - self.started
+        lat = np.array(self.latencies) * 1000 if self.latencies else None
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "errors": self.errors,
+            "batches": self.batches,
+            "avg_batch_rows": round(self.batch_rows / self.batches, 2) if self.batches else 0,
+            "p50_ms": round(float(np.percentile(lat, 50)), 3) if lat is not None else None,
+            "p99_ms": round(float(np.percentile(lat, 99)), 3) if lat is not None else None,
+            "requests_per_sec": round(self.requests / elapsed, 2) if elapsed > 0 else 0,
+            "rows_per_sec": round(self.rows / elapsed, 2) if elapsed > 0 else 0,
+            "uptime_sec": round(elapsed, 1),
+        }
+
+
+class MicroBatcher:
+    """
+    동시에 들어온 요청을 모아 한 번의 predict_proba로 처리
+    - 첫 요청 도착 후 max_wait_ms 동안 또는 max_batch 행이 찰 때까지 대기열을 모음
+    - 예측은 executor 스레드에서 실행 (이벤트 루프는 계속 요청을 받음)
+    """
+
+    def __init__(self, model, features, stats, max_batch=512, max_wait_ms=5):
+        self.model = model
+        self.features = features
+        self.stats = stats
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def score(self, rows):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            size = len(items[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                size += len(item[0])
+
+            matrix = np.vstack([rows for rows, _ in items])
+            try:
+                probs = await loop.run_in_executor(None, self._predict, matrix)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats.batches += 1
+            self.stats.batch_rows += len(matrix)
+            offset = 0
+            for rows, future in items:
+                if not future.done():
+                    future.set_result(probs[offset:offset + len(rows)])
+                offset += len(rows)
+
+    def _predict(self, matrix):
+        return self.model.predict_proba(matrix)[:, 1]
+
+
+class ScoringService:
+    """
+    asyncio 기반 로컬 HTTP 스코어링 서비스 (표준 라이브러리만 사용)
+    - POST /score   : {"steps": ..., ...} 1명 / {"users": [...]} 또는 [...] 여러 명
+    - GET  /metrics : p50/p99 지연시간, 처리량 카운터
+    - GET  /health  : 모델 이름/버전
+    """
+
+    def __init__(self, name="churn_model", version=None, max_batch=512, max_wait_ms=5):
+        self.meta = get_model_meta(name, version)
+        self.model = load_model(name, self.meta["version"])
+        self.features = self.meta.get("features") or BASE_COLS
+        self.stats = LatencyStats()
+        self.batcher = MicroBatcher(self.model, self.features, self.stats,
+                                    max_batch=max_batch, max_wait_ms=max_wait_ms)
+
+    def _parse_users(self, payload):
+        if isinstance(payload, dict) and "users" in payload:
+            users = payload["users"]
+        elif isinstance(payload, list):
+            users = payload
+        else:
+            users = [payload]
+        if not users or not all(isinstance(u, dict) for u in users):
+            raise ValueError("사용자 피처 객체가 필요합니다.")
+        missing = sorted({c for u in users for c in self.features if c not in u})
+        if missing:
+            raise ValueError(f"누락된 피처: {missing}")
+        rows = np.array([[float(u[c]) for c in self.features] for u in users], dtype=np.float32)
+        return users, rows
+
+    async def handle_score(self, body):
+        start = time.perf_counter()
+        users, rows = self._parse_users(json.loads(body or b"null"))
+        probs = await self.batcher.score(rows)
+        results = [
+            {"id": u.get("id"), "churn_prob": round(float(p), 6), "risk": r}
+            for u, p, r in zip(users, probs, _risk_labels(probs))
+        ]
+        self.stats.record(time.perf_counter() - start, len(rows))
+        return {"model": self.meta["name"], "version": self.meta["version"], "results": results}
+
+    async def _route(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok", "model": self.meta["name"], "version": self.meta["version"]}
+        if method == "GET" and path == "/metrics":
+            return 200, self.stats.snapshot()
+        if method == "POST" and path == "/score":
+            try:
+                return 200, await self.handle_score(body)
+            except (ValueError, TypeError, KeyError) as e:
+                self.stats.errors += 1
+                return 400, {"error": str(e)}
+        return 404, {"error": f"not found: {method} {path}"}
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, payload = await self._route(method.upper(), path.split("?")[0], body)
+                except Exception as e:
+                    self.stats.errors += 1
+                    status, payload = 500, {"error": str(e)}
+
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                reason = {200: "OK", 400: "Bad Request", 404: "Not Found"}.get(status, "Internal Server Error")
+                writer.write(
+                    f"HTTP/1.1 {status} {reason}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        self.batcher.start()
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"🚀 스코어링 서비스 시작: http://{host}:{port} ({self.meta['name']} {self.meta['version']})")
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="이탈 확률 로컬 스코어링 서비스")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--name", default="churn_model")
+    parser.add_argument("--version", default=None)
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+    service = ScoringService(args.name, args.version, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    asyncio.run(service.serve(args.host, args.port))
@@ -0,0 +1,40 @@
+import numpy as np
+
+from components.model_train import PARAM_GRID, search_xgb_params
+
+
+def _data(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 5))
+    y = (X[:, 0] + rng.normal(scale=0.5, size=n) > 0.5).astype(int)
+    return X, y
+
+
+def test_small_budget_returns_grid_tree_count():
+    # 예산이 하위 단계(트리 25개 등)에서 끝나도 결과 n_estimators는 그리드 값이어야 함
+    X, y = _data()
+    _, summary = search_xgb_params(X, y, max_fits=2, trial_cache=None)
+
+    assert summary["budget_exhausted"]
+    assert summary["best_params"]["n_estimators"] in PARAM_GRID["n_estimators"]
+    assert summary["fallback_trees"] is not None
+    assert summary["fallback_trees"] < min(PARAM_GRID["n_estimators"])
+    assert summary["best_precision"] is not None
+
+
+def test_zero_budget_uses_first_grid_config():
+    X, y = _data()
+    _, summary = search_xgb_params(X, y, max_fits=0, trial_cache=None)
+
+    assert summary["best_params"] == {"max_depth": PARAM_GRID["max_depth"][0],
+                                      "learning_rate": PARAM_GRID["learning_rate"][0],
+                                      "n_estimators": max(PARAM_GRID["n_estimators"])}
+    assert summary["best_precision"] is None
+
+
+def test_full_budget_needs_no_fallback():
+    X, y = _data()
+    _, summary = search_xgb_params(X, y, trial_cache=None)
+
+    assert summary["fallback_trees"] is None
+    assert summary["best_params"]["n_estimators"] in PARAM_GRID["n_estimators"]
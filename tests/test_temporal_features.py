@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+from utils.temporal_features import temporal_features
+
+
+def test_window_does_not_reach_previous_user():
+    # A: 기간 끝(95~99일) 10000보, B: 기간 시작(0~4일) 100보 → B의 최근 N일 구간이 A 행을 포함하면 안 됨
+    start = pd.Timestamp("2021-01-01")
+    rows = [("A", start + pd.Timedelta(days=d), 10000.0) for d in range(95, 100)]
+    rows += [("B", start + pd.Timedelta(days=d), 100.0) for d in range(0, 5)]
+    df = pd.DataFrame(rows, columns=["id", "date", "steps"])
+
+    out = temporal_features(df, cols=["steps"]).set_index("id")
+
+    for window in (7, 14, 28):
+        assert out.loc["A", f"steps_mean_{window}d"] == 10000.0
+        assert out.loc["B", f"steps_mean_{window}d"] == 100.0
+    assert np.isclose(out.loc["B", "steps_slope_28d"], 0.0)
+    assert out.loc["B", "active_days"] == 5
@@ -0,0 +1,117 @@
+import os
+import json
+import hashlib
+import tempfile
+import pandas as pd
+
+CACHE_DIR = "data/cache"
+
+
+def file_fingerprint(path, hash_bytes=1 << 20):
+    """
+    파일 크기/수정시각 + 앞부분(기본 1MB) 해시로 원본 파일 지문 생성
+    파일이 바뀌면 지문도 바뀌므로 캐시 무효화 키로 사용
+    """
+    stat = os.stat(path)
+    h = hashlib.sha256()
+    h.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(path, "rb") as f:
+        h.update(f.read(hash_bytes))
+    return h.hexdigest()[:16]
+
+
+def params_fingerprint(**params):
+    """
+    파라미터 dict → 짧은 해시 문자열 (정렬된 JSON 기준)
+    """
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def frame_fingerprint(*objs):
+    """
+    DataFrame/Series 내용(값 + 컬럼명) 기반 해시
+    같은 데이터면 세션/프로세스가 달라도 같은 지문이 나옴
+    """
+    h = hashlib.sha256()
+    for obj in objs:
+        if isinstance(obj, pd.DataFrame):
+            h.update(json.dumps([str(c) for c in obj.columns]).encode())
+        else:
+            h.update(str(obj.name).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def parquet_available():
+    """
+    Parquet 엔진(pyarrow 또는 fastparquet) 설치 여부
+    """
+    for engine in ("pyarrow", "fastparquet"):
+        try:
+            __import__(engine)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+def atomic_write(target, write):
+    """
+    write(임시 경로)로 같은 폴더의 고유한 임시 파일에 쓴 뒤 target으로 원자적 교체
+    - 여러 세션이 동시에 써도 서로의 임시 파일을 덮어쓰지 않음 (마지막 교체가 남음)
+    - 임시 파일 이름은 "."으로 시작 → remove_stale의 prefix 정리 대상이 아님
+    - 실패하면 임시 파일 삭제 후 예외 전달
+    """
+    directory = os.path.dirname(target) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(target)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return target
+
+
+def write_frame(df, path):
+    """
+    DataFrame을 컬럼형 바이너리로 저장 (Parquet 우선, 엔진이 없으면 pickle)
+    실제로 저장된 경로를 반환
+    """
+    # ✅ 쓰는 도중 다른 세션이 읽거나 덮어쓰지 않도록 고유 임시 파일 → 원자적 교체
+    if parquet_available():
+        return atomic_write(path + ".parquet", lambda tmp: df.to_parquet(tmp, index=False))
+    return atomic_write(path + ".pkl", lambda tmp: df.to_pickle(tmp))
+
+
+def read_frame(path, columns=None):
+    """
+    write_frame으로 저장한 DataFrame 로드 (없으면 None)
+    columns 지정 시 해당 컬럼만 읽음
+    """
+    if os.path.exists(path + ".parquet") and parquet_available():
+        return pd.read_parquet(path + ".parquet", columns=columns)
+    if os.path.exists(path + ".pkl"):
+        df = pd.read_pickle(path + ".pkl")
+        return df[columns] if columns is not None else df
+    return None
+
+
+def remove_stale(directory, prefix, keep):
+    """
+    같은 prefix로 시작하는 오래된 캐시 파일 정리 (keep으로 시작하는 파일은 유지)
+    """
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and not name.startswith(keep):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
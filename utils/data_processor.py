@@ -1,7 +1,29 @@
 import os
+import numbers
+import numpy as np
 import pandas as pd
 import re
 
+from utils.cache import CACHE_DIR, file_fingerprint, read_frame, write_frame, remove_stale
+from utils.profiling import timed
+
+# ✅ 전처리 로직이 바뀌면 올려서 기존 캐시를 무효화
+PROCESSING_VERSION = 2
+
+# ✅ 사용자 단위 집계에 쓰는 활동 지표 컬럼
+BASE_COLS = ["steps", "calories", "very_active_minutes", "moderately_active_minutes", "distance"]
+DAILY_FILE = "daily_fitbit_sema_df_unprocessed.csv"
+
+# ✅ 대시보드 페이지에서 실제로 쓰는 컬럼 (load_fitbit_data(columns=APP_COLUMNS)로 프로젝션)
+APP_COLUMNS = ["id", "date", "gender", "age"] + BASE_COLS
+
+# ✅ 고유값 비율이 이 값 이하인 문자열 컬럼은 category로 변환
+CATEGORY_MAX_RATIO = 0.5
+
+# ✅ 이탈 확률 → 위험군 구간
+RISK_BINS = [-0.01, 0.3, 0.7, 1.01]
+RISK_LABELS = ["저위험", "중위험", "고위험"]
+
 def convert_age_to_int(age_str):
     """
     문자열 형식의 나이(age)를 평균 숫자값으로 변환
@@ -26,17 +48,39 @@ def convert_age_to_int(age_str):
     except:
         return None
 
-def load_fitbit_data(base_path="data/raw/lifesnaps/rais_anonymized/csv_rais_anonymized"):
+def _age_value(value):
     """
-    Fitbit CSV 데이터를 로드하고, 날짜/나이(age) 컬럼을 전처리한 DataFrame 반환
+    고유값 1개를 나이(float)로 변환 (이미 숫자면 정수로 절삭, 실패 시 NaN)
     """
-    daily_file = os.path.join(base_path, "daily_fitbit_sema_df_unprocessed.csv")
-
-    if not os.path.exists(daily_file):
-        raise FileNotFoundError(f"❌ 파일이 존재하지 않음: {daily_file}")
+    if isinstance(value, numbers.Number) and not isinstance(value, bool):
+        if pd.isnull(value):
+            return np.nan
+        return float(int(value))
+    age = convert_age_to_int(value)
+    return np.nan if age is None else float(age)
 
-    df = pd.read_csv(daily_file)
+def parse_age_series(ages):
+    """
+    나이 컬럼 전체를 벡터 연산으로 숫자(float, 실패 시 NaN)로 변환
+    - 고유 문자열은 몇 개 되지 않으므로 고유값마다 한 번만 convert_age_to_int 규칙 적용
+    - 결과는 factorize 코드로 전체 행에 배열 인덱싱으로 다시 매핑
+    - 이미 숫자형 컬럼이면 그대로 정수 절삭만 수행
+    """
+    ages = pd.Series(ages)
+    if pd.api.types.is_bool_dtype(ages) or not pd.api.types.is_numeric_dtype(ages):
+        codes, uniques = pd.factorize(ages)
+        parsed = np.array([_age_value(u) for u in uniques], dtype=float)
+        values = np.full(len(ages), np.nan)
+        known = codes >= 0
+        values[known] = parsed[codes[known]]
+    else:
+        values = np.trunc(ages.to_numpy(dtype=float, na_value=np.nan))
+    return pd.Series(values, index=ages.index, name=ages.name)
 
+def _clean_fitbit_frame(df):
+    """
+    날짜/나이(age) 컬럼 전처리 (CSV 원본 → 정제된 DataFrame)
+    """
     # ✅ 날짜 컬럼 변환
     if "date" in df.columns:
         df["date"] = pd.to_datetime(df["date"])
@@ -45,10 +89,238 @@ def load_fitbit_data(base_path="data/raw/lifesnaps/rais_anonymized/csv_rais_anon
 
     # ✅ age 전처리: 문자열 → 숫자, NaN 제거
     if "age" in df.columns:
-        df["age"] = df["age"].apply(convert_age_to_int)
+        df["age"] = parse_age_series(df["age"])
         df = df.dropna(subset=["age"])
         df = df[df["age"] >= 10]
     else:
         raise ValueError("❌ 'age' 컬럼이 존재하지 않습니다.")
 
     return df
+
+def _compact_numeric(col):
+    # 값이 바뀌지 않는 범위에서만 축소 (정수값 float → 정수, float32로 정확히 표현되면 float32)
+    values = col.to_numpy()
+    if pd.api.types.is_integer_dtype(col.dtype):
+        return pd.to_numeric(col, downcast="integer")
+    if not pd.api.types.is_float_dtype(col.dtype):
+        return col
+    finite = values[~np.isnan(values)]
+    if len(finite) == len(values) and np.array_equal(finite, np.trunc(finite)):
+        return pd.to_numeric(col, downcast="integer")
+    as32 = values.astype(np.float32)
+    if np.array_equal(as32.astype(values.dtype), values, equal_nan=True):
+        return pd.Series(as32, index=col.index, name=col.name)
+    return col
+
+@timed("frame.compact")
+def compact_frame(df, category_cols=("id",), category_max_ratio=CATEGORY_MAX_RATIO):
+    """
+    메모리 절약용 dtype 변환 (값은 그대로 유지)
+    - id 및 고유값이 적은 문자열 컬럼 → category
+    - 숫자 컬럼 → 손실 없는 범위에서 더 작은 정수/float32로 축소
+    """
+    out = {}
+    for name in df.columns:
+        col = df[name]
+        if name in category_cols or (
+            (col.dtype == object or pd.api.types.is_string_dtype(col.dtype))
+            and col.nunique(dropna=True) <= category_max_ratio * max(len(col), 1)
+        ):
+            out[name] = col.astype("category")
+        elif pd.api.types.is_numeric_dtype(col.dtype) and not pd.api.types.is_bool_dtype(col.dtype):
+            out[name] = _compact_numeric(col)
+        else:
+            out[name] = col
+    compact = pd.DataFrame(out, index=df.index)
+    compact.attrs = dict(df.attrs)
+    return compact
+
+def memory_report(before, after):
+    """
+    컬럼별 dtype / 메모리(MB) 변환 전후 비교 (마지막 행은 합계)
+    """
+    mb_before = before.memory_usage(deep=True, index=False) / 1024 ** 2
+    mb_after = after.memory_usage(deep=True, index=False) / 1024 ** 2
+    report = pd.DataFrame({
+        "column": list(after.columns),
+        "dtype_before": [str(before[c].dtype) for c in after.columns],
+        "dtype_after": [str(after[c].dtype) for c in after.columns],
+        "mb_before": mb_before[after.columns].to_numpy(),
+        "mb_after": mb_after[after.columns].to_numpy(),
+    })
+    total = {"column": "(합계)", "dtype_before": "", "dtype_after": "",
+             "mb_before": report["mb_before"].sum(), "mb_after": report["mb_after"].sum()}
+    report = pd.concat([report, pd.DataFrame([total])], ignore_index=True)
+    report["ratio"] = (report["mb_after"] / report["mb_before"]).round(3)
+    return report.round({"mb_before": 3, "mb_after": 3})
+
+def load_fitbit_data(base_path="data/raw/lifesnaps/rais_anonymized/csv_rais_anonymized",
+                     columns=None, use_cache=True, cache_dir=CACHE_DIR, compact=False):
+    """
+    Fitbit CSV 데이터를 로드하고, 날짜/나이(age) 컬럼을 전처리한 DataFrame 반환
+
+    - use_cache=True 이면 전처리가 끝난 DataFrame을 컬럼형 파일(Parquet)로 저장해 두고,
+      원본 CSV의 지문(크기/수정시각/해시)이 같으면 CSV 파싱 없이 캐시에서 바로 로드
+    - columns 지정 시 해당 컬럼만 읽어서 반환 (컬럼 프로젝션)
+    - compact=True 이면 compact_frame으로 dtype을 줄이고, 컬럼별 메모리 비교표를
+      df.attrs["memory_report"]에 기록
+    """
+    daily_file = os.path.join(base_path, DAILY_FILE)
+
+    if not os.path.exists(daily_file):
+        raise FileNotFoundError(f"❌ 파일이 존재하지 않음: {daily_file}")
+
+    if columns is not None:
+        columns = list(dict.fromkeys(columns))
+
+    fingerprint = file_fingerprint(daily_file)
+    prefix = "daily_fitbit_sema_df."
+    cache_path = os.path.join(cache_dir, f"{prefix}{fingerprint}.v{PROCESSING_VERSION}")
+
+    df = read_frame(cache_path, columns=columns) if use_cache else None
+
+    if df is None:
+        if use_cache:
+            # ✅ 캐시에는 항상 전체 컬럼을 저장해 두고 로드할 때 프로젝션
+            df = _clean_fitbit_frame(pd.read_csv(daily_file))
+            df = df.reset_index(drop=True)
+            remove_stale(cache_dir, prefix, keep=f"{prefix}{fingerprint}.v{PROCESSING_VERSION}")
+            write_frame(df, cache_path)
+            if columns is not None:
+                df = df[columns]
+        else:
+            # ✅ 캐시 미사용 시에도 필요한 컬럼만 파싱 (date/age는 전처리에 필요)
+            usecols = None
+            if columns is not None:
+                usecols = list(dict.fromkeys(columns + ["date", "age"]))
+            df = _clean_fitbit_frame(pd.read_csv(daily_file, usecols=usecols))
+            if columns is not None:
+                df = df[columns]
+
+    if compact:
+        compacted = compact_frame(df)
+        report = memory_report(df, compacted)
+        df = compacted
+        df.attrs["memory_report"] = report.to_dict("records")
+
+    df.attrs["source_fingerprint"] = fingerprint
+    return df
+
+
+def label_churned(df_user):
+    """
+    사용자 평균 활동량 기준 이탈(CHURNED) 라벨 부여
+    """
+    score = (
+        (df_user["steps"] < 6400).astype(int) +
+        (df_user["calories"] < 1800).astype(int) +
+        (df_user["very_active_minutes"] < 6).astype(int) * 2 +
+        (df_user["moderately_active_minutes"] < 8).astype(int) +
+        (df_user["distance"] < 4600).astype(int)
+    )
+    df_user["CHURNED"] = (score >= 4).astype(int)
+    return df_user
+
+def assign_risk(probs):
+    """
+    이탈 확률 → 위험군(저위험/중위험/고위험) 범주
+    """
+    return pd.cut(probs, bins=RISK_BINS, labels=RISK_LABELS)
+
+def user_feature_columns(df_user):
+    """
+    사용자 테이블의 학습 피처 컬럼 (id/CHURNED 제외, temporal=False 이면 BASE_COLS와 같음)
+    """
+    return [c for c in df_user.columns if c not in ("id", "CHURNED")]
+
+@timed("user_table.build")
+def build_user_table(df, temporal=False):
+    """
+    일 단위 DataFrame → 사용자(id)별 평균 활동량 + CHURNED 테이블
+    이미 사용자 단위 테이블(stream_user_table 결과 등)이면 복사본을 그대로 반환
+    temporal=True 이면 utils.temporal_features의 시계열 피처(최근 N일 평균/기울기/비활동 연속일 등)를 덧붙임
+    (CHURNED 라벨은 기존처럼 전체 평균 기준)
+    """
+    if "CHURNED" in df.columns and "date" not in df.columns:
+        return df.copy()
+    df = df.dropna(subset=BASE_COLS + ["id"])
+    # compact_frame으로 축소된 정수/float32 컬럼도 float64로 평균 (원본 dtype일 때와 같은 값)
+    values = df[BASE_COLS].astype("float64")
+    df_user = label_churned(values.groupby(df["id"], observed=True).mean().reset_index())
+    if not temporal:
+        return df_user
+
+    from utils.temporal_features import temporal_features  # utils.temporal_features가 BASE_COLS를 import (순환 방지)
+    features = temporal_features(df)
+    # 최근 구간 기록일이 하루뿐이라 기울기를 못 구한 사용자는 변화 없음(0)으로 (로지스틱 회귀/SVM 비교 모델용)
+    slope_cols = [c for c in features.columns if "_slope_" in c]
+    features[slope_cols] = features[slope_cols].fillna(0.0)
+    features["id"] = features["id"].astype(df_user["id"].dtype)
+    feature_cols = [c for c in features.columns if c != "id"]
+    return df_user.merge(features, on="id", how="left")[["id"] + BASE_COLS + feature_cols + ["CHURNED"]]
+
+def daily_user_stats(chunk):
+    """
+    일 단위 행(CSV 청크 등) → 사용자별 합계/행 수/마지막 기록일
+    load_fitbit_data + prepare_data와 같은 행 필터(나이, 결측치)를 적용
+    """
+    chunk = chunk.copy()
+    chunk["date"] = pd.to_datetime(chunk["date"])
+    chunk["age"] = parse_age_series(chunk["age"])
+    chunk = chunk[chunk["age"] >= 10]
+    chunk = chunk.dropna(subset=BASE_COLS + ["id"])
+    grouped = chunk.groupby("id", sort=False, observed=True)
+    stats = grouped[BASE_COLS].sum()
+    stats["n_days"] = grouped.size()
+    stats["last_date"] = grouped["date"].max()
+    return stats
+
+def merge_user_stats(total, stats):
+    """
+    사용자별 누적 통계(합계/행 수/마지막 기록일) 두 개를 합침
+    """
+    if total is None or total.empty:
+        return stats
+    if stats.empty:
+        return total
+    sum_cols = BASE_COLS + ["n_days"]
+    merged = total[sum_cols].add(stats[sum_cols], fill_value=0)
+    merged["last_date"] = pd.concat([total["last_date"], stats["last_date"]], axis=1).max(axis=1)
+    return merged
+
+def stats_to_user_table(stats):
+    """
+    누적 통계 → 사용자 평균 테이블(id + BASE_COLS + CHURNED)
+    """
+    stats = stats[stats["n_days"] > 0].sort_index()
+    df_user = stats[BASE_COLS].div(stats["n_days"], axis=0)
+    df_user.index.name = "id"
+    df_user = df_user.reset_index()
+    return label_churned(df_user)
+
+def stream_user_stats(base_path="data/raw/lifesnaps/rais_anonymized/csv_rais_anonymized",
+                      chunksize=200_000):
+    """
+    일 단위 CSV를 chunksize 행씩 읽으며 사용자별 합계/행 수/마지막 기록일만 누적
+    메모리 사용량은 파일 크기가 아니라 청크 크기 + 사용자 수에 비례
+    """
+    daily_file = os.path.join(base_path, DAILY_FILE)
+    if not os.path.exists(daily_file):
+        raise FileNotFoundError(f"❌ 파일이 존재하지 않음: {daily_file}")
+
+    usecols = ["id", "date", "age"] + BASE_COLS
+    total = None
+    for chunk in pd.read_csv(daily_file, usecols=usecols, chunksize=chunksize):
+        total = merge_user_stats(total, daily_user_stats(chunk))
+
+    if total is None:
+        raise ValueError("❌ 데이터가 비어 있습니다.")
+    return total
+
+def stream_user_table(base_path="data/raw/lifesnaps/rais_anonymized/csv_rais_anonymized",
+                      chunksize=200_000):
+    """
+    일 단위 DataFrame을 메모리에 올리지 않고 바로 사용자 평균 테이블(df_user) 생성
+    결과는 prepare_data(df)의 df 인자로 그대로 넘길 수 있음
+    """
+    return stats_to_user_table(stream_user_stats(base_path, chunksize=chunksize))
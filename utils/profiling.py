@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+# ✅ 구간(span) 측정: start_run(enabled=True)를 호출한 스레드(= Streamlit 스크립트 실행 1회)에서만 기록
+#    꺼져 있으면 span()은 미리 만든 nullcontext를 돌려주므로 비용은 thread-local 조회 1번 수준
+_local = threading.local()
+_NULL = nullcontext()
+
+# ✅ 프로세스 전체 누적값 (Prometheus 내보내기용): 이름 → [횟수, 합계 초, 최대 초]
+_totals = {}
+_totals_lock = threading.Lock()
+
+
+def start_run(enabled=False, memory=False):
+    """
+    현재 스레드의 측정 시작 (이전 기록 초기화)
+    memory=True 이면 tracemalloc으로 구간별 할당량(MB)/최대 사용량도 기록
+    """
+    if not enabled:
+        _local.records = None
+        return
+    _local.records = []
+    _local.depth = 0
+    _local.started_tracing = memory and not tracemalloc.is_tracing()
+    if _local.started_tracing:
+        tracemalloc.start()
+    _local.memory = memory
+
+
+def end_run():
+    """
+    현재 스레드의 측정 종료, 기록 목록 반환 (start_run에서 켠 tracemalloc은 여기서 끔)
+    """
+    records = getattr(_local, "records", None)
+    if records is not None and getattr(_local, "started_tracing", False):
+        tracemalloc.stop()
+    _local.records = None
+    return records or []
+
+
+def is_enabled():
+    return getattr(_local, "records", None) is not None
+
+
+@contextmanager
+def _span(records, name, labels):
+    memory = _local.memory and tracemalloc.is_tracing()
+    if memory:
+        if _local.depth == 0:
+            tracemalloc.reset_peak()
+        mem_start = tracemalloc.get_traced_memory()[0]
+    record = {"name": name, "depth": _local.depth, **labels}
+    records.append(record)
+    _local.depth += 1
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        seconds = time.perf_counter() - start
+        _local.depth -= 1
+        record["seconds"] = round(seconds, 6)
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            record["alloc_mb"] = round((current - mem_start) / 1024 ** 2, 3)
+            record["peak_mb"] = round(peak / 1024 ** 2, 3)
+        with _totals_lock:
+            total = _totals.setdefault(name, [0, 0.0, 0.0])
+            total[0] += 1
+            total[1] += seconds
+            total[2] = max(total[2], seconds)
+
+
+def span(name, **labels):
+    """
+    with span("pipeline.score"): ... 형태로 구간 시간(및 메모리) 측정
+    labels는 기록에 그대로 남음 (예: status="hit")
+    """
+    records = getattr(_local, "records", None)
+    if records is None:
+        return _NULL
+    return _span(records, name, labels)
+
+
+def timed(name=None):
+    """
+    함수 전체를 구간으로 측정하는 데코레이터 (이름 생략 시 모듈.함수명)
+    """
+    def decorator(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "records", None) is None:
+                return func(*args, **kwargs)
+            with span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def summarize(records):
+    """
+    구간 이름별 횟수/합계/최대 시간 (실행 1회 기록 기준)
+    """
+    summary = {}
+    for r in records:
+        s = summary.setdefault(r["name"], {"name": r["name"], "count": 0, "seconds": 0.0, "max_seconds": 0.0})
+        s["count"] += 1
+        s["seconds"] += r.get("seconds", 0.0)
+        s["max_seconds"] = max(s["max_seconds"], r.get("seconds", 0.0))
+    return sorted(summary.values(), key=lambda s: -s["seconds"])
+
+
+def to_json(records):
+    return json.dumps({"created_at": time.strftime("%Y-%m-%d %H:%M:%S"), "spans": records},
+                      ensure_ascii=False, indent=2)
+
+
+def to_prometheus(prefix="churn_dashboard"):
+    """
+    프로세스 누적값을 Prometheus 텍스트 형식으로 (node_exporter textfile collector 등에서 수집)
+    """
+    with _totals_lock:
+        totals = {name: list(v) for name, v in _totals.items()}
+
+    def _label(name):
+        return name.replace("\\", "\\\\").replace('"', '\\"')
+
+    lines = [
+        f"# HELP {prefix}_span_seconds_total 구간 누적 실행 시간",
+        f"# TYPE {prefix}_span_seconds_total counter",
+    ]
+    lines += [f'{prefix}_span_seconds_total{{span="{_label(n)}"}} {v[1]:.6f}' for n, v in sorted(totals.items())]
+    lines += [f"# HELP {prefix}_span_count_total 구간 실행 횟수", f"# TYPE {prefix}_span_count_total counter"]
+    lines += [f'{prefix}_span_count_total{{span="{_label(n)}"}} {v[0]}' for n, v in sorted(totals.items())]
+    lines += [f"# HELP {prefix}_span_max_seconds 구간 최대 실행 시간", f"# TYPE {prefix}_span_max_seconds gauge"]
+    lines += [f'{prefix}_span_max_seconds{{span="{_label(n)}"}} {v[2]:.6f}' for n, v in sorted(totals.items())]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, prefix="churn_dashboard"):
+    # 수집기가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(to_prometheus(prefix))
+    os.replace(tmp_path, path)
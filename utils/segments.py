@@ -0,0 +1,82 @@
+import pandas as pd
+
+from utils.data_processor import BASE_COLS, parse_age_series
+from utils.profiling import timed
+
+# ✅ 세그먼트 차원: 위험군 × 연령대 × 성별 (있는 컬럼만 사용)
+SEGMENT_DIMS = ["risk", "age_group", "gender"]
+
+# ✅ 연령대 구간 (10세 미만/나이 없음은 연령대 없음)
+AGE_BINS = [0, 29, 39, 49, 59, 69, 150]
+AGE_LABELS = ["20대", "30대", "40대", "50대", "60대", "70대 이상"]
+MIN_AGE = 10
+
+# ✅ 활동 부족 조건 (이름 → (컬럼, 기준값 미만))
+CONDITIONS = {
+    "걸음 수 < 6400": ("steps", 6400),
+    "칼로리 소모 < 1800": ("calories", 1800),
+    "매우 활동적인 시간 < 6": ("very_active_minutes", 6),
+    "보통 활동 시간 < 8": ("moderately_active_minutes", 8),
+    "이동 거리 < 4600": ("distance", 4600),
+}
+
+
+def segment_keys(df_user):
+    """
+    사용자 테이블 → 세그먼트 차원 컬럼 (risk / age_group / gender 중 만들 수 있는 것만)
+    """
+    keys = {}
+    if "risk" in df_user.columns:
+        keys["risk"] = df_user["risk"]
+    if "age" in df_user.columns:
+        age = parse_age_series(df_user["age"])
+        keys["age_group"] = pd.cut(age.where(age >= MIN_AGE), bins=AGE_BINS, labels=AGE_LABELS)
+    if "gender" in df_user.columns:
+        keys["gender"] = df_user["gender"].astype("string").str.upper()
+    return pd.DataFrame(keys, index=df_user.index)
+
+
+@timed("segments.build_cube")
+def build_segment_cube(df_user, base_cols=BASE_COLS, conditions=CONDITIONS):
+    """
+    사용자 테이블을 한 번의 groupby로 세그먼트별 집계 (합계만 저장 → 어떤 차원 조합으로도 재집계 가능)
+    컬럼: n, n_valid(지표 결측 없는 인원), <지표>_sum, <지표>_count, <조건>_hits
+    """
+    keys = segment_keys(df_user)
+    valid = df_user[base_cols].notna().all(axis=1)
+
+    values = {"n": 1, "n_valid": valid.astype("int64")}
+    for col in base_cols:
+        values[f"{col}_sum"] = df_user[col].fillna(0).astype("float64")
+        values[f"{col}_count"] = df_user[col].notna().astype("int64")
+    for name, (col, limit) in conditions.items():
+        values[f"{name}_hits"] = ((df_user[col] < limit) & valid).astype("int64")
+    frame = pd.DataFrame(values, index=df_user.index)
+
+    if keys.empty:
+        return frame.sum().to_frame().T.astype(frame.dtypes)
+    return pd.concat([keys, frame], axis=1).groupby(list(keys.columns), observed=True, dropna=False).sum()
+
+
+def segment_query(cube, by=(), **filters):
+    """
+    큐브에서 세그먼트 조회 (원본 테이블 재스캔 없음)
+    - by: 결과 행으로 남길 차원 (비우면 전체 1행)
+    - filters: 차원=값 또는 값 목록 (예: risk="고위험", gender=["MALE", "FEMALE"])
+    반환 컬럼: n, <지표>_sum, <지표>_mean, <조건>_rate
+    """
+    sub = cube
+    for dim, value in filters.items():
+        allowed = value if isinstance(value, (list, tuple, set)) else [value]
+        sub = sub[sub.index.get_level_values(dim).isin(allowed)]
+
+    by = list(by)
+    totals = sub.groupby(level=by, observed=True).sum() if by else sub.sum().to_frame().T.astype(sub.dtypes)
+
+    result = pd.DataFrame({"n": totals["n"]}, index=totals.index)
+    for col in [c[:-len("_sum")] for c in totals.columns if c.endswith("_sum")]:
+        result[f"{col}_sum"] = totals[f"{col}_sum"]
+        result[f"{col}_mean"] = totals[f"{col}_sum"] / totals[f"{col}_count"].where(totals[f"{col}_count"] > 0)
+    for name in [c[:-len("_hits")] for c in totals.columns if c.endswith("_hits")]:
+        result[f"{name}_rate"] = totals[f"{name}_hits"] / totals["n_valid"].where(totals["n_valid"] > 0)
+    return result
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+from utils.data_processor import BASE_COLS
+from utils.profiling import timed
+
+# ✅ 사용자별 시계열 피처 설정
+WINDOWS = (7, 14, 28)          # 마지막 기록일 기준 최근 N일(달력 기준) 평균
+SLOPE_WINDOW = 28              # 최근 N일 일별 값의 기울기 (하루당 변화량)
+INACTIVE_COL = "steps"
+INACTIVE_BELOW = 1000          # 이 값 미만(또는 결측)인 기록일은 비활동일
+
+
+def _segments(df, reference_date):
+    # (id 코드, 날짜)를 정수 키 하나로 합쳐 한 번만 정렬 → 사용자별 행이 날짜순으로 연속된 구간(segment)
+    dates = pd.to_datetime(df["date"])
+    valid = dates.notna().to_numpy() & df["id"].notna().to_numpy()
+    codes, uniques = pd.factorize(df["id"][valid] if not valid.all() else df["id"], sort=False)
+    day = dates.to_numpy()[valid].astype("datetime64[D]").astype(np.int64)
+
+    first = day.min() if len(day) else 0
+    span = (day.max() - first + 1) if len(day) else 1
+    key = codes.astype(np.int64) * span + (day - first)
+    order = np.argsort(key, kind="stable")
+    key = key[order]
+    user = codes[order]              # factorize 코드는 0..사용자수-1 이므로 정렬 후 그대로 사용자 번호
+    day = day[order]
+
+    starts = np.flatnonzero(np.r_[True, user[1:] != user[:-1]]) if len(user) else np.array([], dtype=np.int64)
+    ends = np.r_[starts[1:], len(user)] - 1
+
+    if reference_date is None:
+        reference_day = day.max() if len(day) else 0
+    else:
+        reference_day = np.datetime64(pd.Timestamp(reference_date), "D").astype(np.int64)
+    segments = {"valid": valid, "order": order, "key": key, "user": user, "day": day,
+                "starts": starts, "ends": ends, "first": first, "span": span}
+    return segments, uniques[user[starts]], reference_day
+
+
+def _window_starts(seg, window):
+    # 정렬된 키에서 "마지막 기록일 - window + 1" 이상인 첫 위치 = 최근 window일 구간의 시작 (구간의 접미부)
+    # 목표 키가 user_base 아래로 내려가면 이전 사용자 구간으로 넘어가므로 사용자 자신의 키 범위로 제한
+    user_base = np.arange(len(seg["starts"]), dtype=np.int64) * seg["span"]
+    last_day = seg["day"][seg["ends"]]
+    target = np.maximum(user_base + (last_day - window + 1 - seg["first"]), user_base)
+    return np.searchsorted(seg["key"], target, side="left")
+
+
+def _suffix_sums(prefix, window_start, ends):
+    # 누적합 배열(앞에 0 추가)로 [window_start, end] 구간 합을 사용자마다 O(1)에 계산
+    return prefix[ends + 1] - prefix[window_start]
+
+
+def _prefix(values):
+    return np.concatenate([[0.0], np.cumsum(values, dtype=np.float64)])
+
+
+@timed("temporal.features")
+def temporal_features(df, cols=BASE_COLS, windows=WINDOWS, slope_window=SLOPE_WINDOW,
+                      inactive_col=INACTIVE_COL, inactive_below=INACTIVE_BELOW, reference_date=None):
+    """
+    일 단위 DataFrame → 사용자(id)별 시계열 피처 (정렬 1번 + 누적합/reduceat, 사용자별 루프 없음)
+    - <col>_mean_<N>d        : 마지막 기록일 포함 최근 N일 평균
+    - <col>_slope_<N>d       : 최근 N일 값 ~ 날짜 최소제곱 기울기 (하루당)
+    - inactive_streak_max    : 연속 비활동 기록일 최장 길이
+    - inactive_streak_current: 마지막 기록일까지 이어지는 연속 비활동 기록일 수
+    - max_gap_days           : 기록 사이 최장 공백 일수
+    - days_since_last_record : 기준일(기본: 전체 데이터의 마지막 날짜) - 사용자 마지막 기록일
+    - active_days            : 기록일 수
+    """
+    seg, ids, reference_day = _segments(df, reference_date)
+    starts, ends, user, day = seg["starts"], seg["ends"], seg["user"], seg["day"]
+    features = {"id": ids}
+    window_starts = {w: _window_starts(seg, w) for w in sorted(set(windows) | {slope_window})}
+
+    # 기울기용 x = 마지막 기록일 기준 상대 날짜 (≤ 0, 작은 값이라 누적합 정밀도 유지)
+    x = (day - day[ends][user]).astype(np.float64)
+
+    def _column(name):
+        values = df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[seg["valid"]][seg["order"]] if not seg["valid"].all() else values[seg["order"]]
+        present = ~np.isnan(values)
+        return np.where(present, values, 0.0), present
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for col in cols:
+            values, present = _column(col)
+            sum_prefix = _prefix(values)
+            count_prefix = _prefix(present)
+            for window in windows:
+                ws = window_starts[window]
+                features[f"{col}_mean_{window}d"] = (_suffix_sums(sum_prefix, ws, ends)
+                                                     / _suffix_sums(count_prefix, ws, ends))
+
+            # 최소제곱 기울기: (nΣxy - ΣxΣy) / (nΣx² - (Σx)²)
+            ws = window_starts[slope_window]
+            px = x * present
+            n = _suffix_sums(count_prefix, ws, ends)
+            sx = _suffix_sums(_prefix(px), ws, ends)
+            sy = _suffix_sums(sum_prefix, ws, ends)
+            sxy = _suffix_sums(_prefix(px * values), ws, ends)
+            sxx = _suffix_sums(_prefix(px * x), ws, ends)
+            denom = n * sxx - sx ** 2
+            features[f"{col}_slope_{slope_window}d"] = np.where(denom > 1e-9, (n * sxy - sx * sy) / denom, np.nan)
+
+    # 연속 비활동 기록일: 마지막 "끊김" 위치(활동일 또는 사용자 시작 직전)부터의 거리
+    values, present = _column(inactive_col)
+    inactive = ~present | (values < inactive_below)
+    idx = np.arange(len(user))
+    seg_start = np.zeros(len(user), dtype=bool)
+    seg_start[starts] = True
+    breaks = np.where(~inactive, idx, np.where(seg_start, idx - 1, -1))
+    run_length = idx - np.maximum.accumulate(breaks) if len(idx) else idx
+    features["inactive_streak_max"] = np.maximum.reduceat(run_length, starts) if len(starts) else run_length
+    features["inactive_streak_current"] = run_length[ends]
+
+    # 기록 사이 공백 (같은 날 중복 기록은 0)
+    gaps = np.where(seg_start, 0, np.maximum(np.diff(day, prepend=day[:1]) - 1, 0)) if len(day) else day
+    features["max_gap_days"] = np.maximum.reduceat(gaps, starts) if len(starts) else gaps
+
+    features["days_since_last_record"] = reference_day - day[ends]
+    features["active_days"] = ends - starts + 1
+    return pd.DataFrame(features)
+
+
+def temporal_feature_names(cols=BASE_COLS, windows=WINDOWS, slope_window=SLOPE_WINDOW):
+    names = [f"{c}_mean_{w}d" for c in cols for w in windows] + [f"{c}_slope_{slope_window}d" for c in cols]
+    return names + ["inactive_streak_max", "inactive_streak_current", "max_gap_days",
+                    "days_since_last_record", "active_days"]
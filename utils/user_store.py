@@ -0,0 +1,105 @@
+import os
+import pandas as pd
+
+from utils.cache import CACHE_DIR, read_frame, write_frame
+from utils.data_processor import (
+    BASE_COLS, daily_user_stats, merge_user_stats, stream_user_stats, label_churned
+)
+
+STORE_PATH = os.path.join(CACHE_DIR, "user_store")
+STORE_COLS = BASE_COLS + ["n_days", "last_date", "CHURNED"]
+
+
+def _with_labels(stats):
+    """
+    누적 통계(합계/행 수)에 평균 기준 CHURNED 라벨을 다시 붙임
+    """
+    means = stats[BASE_COLS].div(stats["n_days"], axis=0)
+    stats = stats.copy()
+    stats["CHURNED"] = label_churned(means)["CHURNED"]
+    return stats
+
+
+def load_user_store(path=STORE_PATH):
+    """
+    저장된 사용자 집계 저장소 로드 (id 인덱스, 없으면 None)
+    """
+    store = read_frame(path)
+    if store is None:
+        return None
+    return store.set_index("id")
+
+
+def save_user_store(store, path=STORE_PATH):
+    """
+    사용자 집계 저장소 저장 (합계/행 수/마지막 기록일/CHURNED)
+    """
+    store = store[STORE_COLS].copy()
+    store.index.name = "id"
+    return write_frame(store.reset_index(), path)
+
+
+def build_user_store(base_path="data/raw/lifesnaps/rais_anonymized/csv_rais_anonymized",
+                     path=STORE_PATH, chunksize=200_000):
+    """
+    전체 일 단위 CSV에서 저장소를 처음부터 생성 (최초 1회 또는 전처리 규칙 변경 시)
+    """
+    store = _with_labels(stream_user_stats(base_path, chunksize=chunksize))
+    save_user_store(store, path)
+    return store
+
+
+def append_daily_rows(df_new, path=STORE_PATH):
+    """
+    새로 추가된 일 단위 행을 저장소에 반영
+    - 사용자별 마지막 기록일 이후의 행만 반영 (같은 파일을 다시 넣어도 중복 집계되지 않음)
+    - 새 데이터에 등장한 사용자만 평균/CHURNED 재계산, 나머지 사용자는 그대로 유지
+    반환: 반영 결과 요약 dict
+    """
+    store = load_user_store(path)
+    df_new = df_new.copy()
+    df_new["date"] = pd.to_datetime(df_new["date"])
+
+    # ✅ 이미 반영된 날짜의 행은 제외
+    skipped = 0
+    if store is not None and not store.empty:
+        last_seen = df_new["id"].map(store["last_date"])
+        fresh = last_seen.isna() | (df_new["date"] > last_seen)
+        skipped = int((~fresh).sum())
+        df_new = df_new[fresh]
+
+    stats = daily_user_stats(df_new)
+    summary = {"rows": len(df_new), "skipped_rows": skipped, "affected_users": len(stats), "new_users": 0}
+    if stats.empty:
+        return summary
+
+    if store is None or store.empty:
+        store = _with_labels(stats)
+        summary["new_users"] = len(stats)
+    else:
+        # ✅ 영향받은 사용자 행만 합산 후 라벨 재계산
+        known = stats.index.intersection(store.index)
+        summary["new_users"] = len(stats.index.difference(store.index))
+        previous = store.loc[known, BASE_COLS + ["n_days", "last_date"]]
+        updated = _with_labels(merge_user_stats(previous, stats))
+        untouched = store.drop(index=updated.index, errors="ignore")
+        store = pd.concat([untouched, updated[STORE_COLS]])
+
+    save_user_store(store, path)
+    return summary
+
+
+def user_store_table(path=STORE_PATH):
+    """
+    저장소 → 사용자 평균 테이블(id + BASE_COLS + CHURNED)
+    prepare_data(df)의 df 인자로 그대로 넘길 수 있음
+    """
+    store = load_user_store(path)
+    if store is None:
+        raise FileNotFoundError(f"❌ 사용자 집계 저장소가 없습니다: {path} (build_user_store 먼저 실행)")
+    store = store.sort_index()
+    df_user = store[BASE_COLS].div(store["n_days"], axis=0)
+    # 라벨은 갱신 시점에 이미 재계산되어 있으므로 저장된 값을 그대로 사용
+    df_user["CHURNED"] = store["CHURNED"].astype(int)
+    df_user.index.name = "id"
+    return df_user.reset_index()